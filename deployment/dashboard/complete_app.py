@@ -6,6 +6,7 @@ import pandas as pd
 import numpy as np
 import random
 import os
+import time
 
 # Page configuration
 st.set_page_config(
@@ -109,9 +110,15 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+API_RETRY_SECONDS = 30  # back-off after the scoring API fails
+
 class SecurityModelInterface:
     """Your 99.1% accuracy ML model interface"""
-    def __init__(self):
+    def __init__(self, api_url=None):
+        # Scoring service (src/api/service.py); without it predictions are simulated
+        self.api_url = (api_url or os.environ.get('SECURITY_API_URL', '')).rstrip('/')
+        self.api_retry_at = 0.0  # after a failed call, simulate until this time
+        
         # Your ACTUAL performance metrics from the notebook
         self.performance_metrics = {
             'accuracy': 0.991,           # Your actual 99.1%
@@ -135,8 +142,38 @@ class SecurityModelInterface:
             'num_failed_logins': 0.001 # 0.1% - Failed logins
         }
     
-    def predict_threat(self):
-        """Simulate prediction based on your 99.1% accuracy"""
+    def score_records(self, records):
+        """Score records with one /predict/batch call; None when the API can't answer"""
+        if not self.api_url or not records or time.time() < self.api_retry_at:
+            return None
+        import json
+        import urllib.request
+        request = urllib.request.Request(
+            f"{self.api_url}/predict/batch", data=json.dumps(records).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                results = json.loads(response.read())
+            if len(results) != len(records):
+                raise ValueError(f"expected {len(records)} results, got {len(results)}")
+            return [{
+                'is_attack': bool(result['is_attack']),
+                'confidence': float(result['confidence']),
+                'timestamp': datetime.now()
+            } for result in results]
+        except (OSError, ValueError, KeyError, TypeError) as e:  # URLError/timeouts are OSErrors
+            # API down or misbehaving: keep the dashboard up on simulated scores
+            print(f"⚠️ Scoring API unavailable ({e}); simulating for {API_RETRY_SECONDS}s")
+            self.api_retry_at = time.time() + API_RETRY_SECONDS
+            return None
+    
+    def predict_threat(self, record=None):
+        """Score a connection record via the API, or simulate one"""
+        scored = self.score_records([record]) if record is not None else None
+        if scored:
+            return scored[0]
+        
         # High-fidelity simulation based on your actual results
         is_attack = np.random.choice([0, 1], p=[0.533, 0.467])  # Your actual class distribution
         confidence = np.random.uniform(0.91, 0.99)  # Based on your accuracy range
@@ -166,7 +203,9 @@ class SecurityModelInterface:
 
 class SecurityDataConnector:
     """Data connector using your actual analysis results"""
-    def __init__(self):
+    def __init__(self, model_interface=None):
+        # Scores each generated connection (API or simulation)
+        self.model_interface = model_interface or SecurityModelInterface()
         # Your actual attack patterns from KDD Cup analysis
         self.attack_types = ['Port Scan', 'DDoS', 'Brute Force', 'Buffer Overflow', 'Rootkit']
         self.high_risk_services = ['private', 'ecr_i', 'eco_i', 'finger', 'telnet']  # Your 95%+ attack rates
@@ -216,6 +255,7 @@ class SecurityDataConnector:
     def generate_recent_threats(self, count=8):
         """Generate recent threat detections based on your analysis"""
         threats = []
+        connections = []
         current_time = datetime.now()
         
         for i in range(count):
@@ -225,9 +265,6 @@ class SecurityDataConnector:
             attack_type = random.choice(self.attack_types)
             source_ip = f"{random.randint(10,192)}.{random.randint(0,255)}.{random.randint(0,255)}.{random.randint(1,254)}"
             
-            # Confidence based on your 99.1% accuracy
-            confidence = random.uniform(0.911, 0.998)
-            
             # Service based on your risk analysis
             if random.random() > 0.6:
                 service = random.choice(self.high_risk_services)
@@ -236,20 +273,51 @@ class SecurityDataConnector:
                 service = random.choice(['http', 'domain_u', 'smtp', 'ftp_data'])
                 risk_level = random.choice(['LOW', 'MEDIUM'])
             
+            connection = self.connection_record(service, attack_type, risk_level)
+            
             threat = {
                 'time': threat_time.strftime('%H:%M'),
                 'type': attack_type,
                 'source': source_ip,
                 'service': service,
                 'risk_level': risk_level,
-                'confidence': round(confidence, 3),
+                'confidence': round(random.uniform(0.911, 0.998), 3),  # Based on your 99.1% accuracy
                 'status': 'BLOCKED',
-                'bytes_blocked': random.randint(1024, 50000)
+                'bytes_blocked': connection['src_bytes']
             }
             threats.append(threat)
+            connections.append(connection)
+        
+        # With the scoring API up, the model decides (one batch call per refresh)
+        predictions = self.model_interface.score_records(connections)
+        for threat, prediction in zip(threats, predictions or []):
+            threat['confidence'] = round(prediction['confidence'], 3)
+            if not prediction['is_attack']:
+                threat['status'] = 'ALLOWED'
+                threat['bytes_blocked'] = 0
         
         return sorted(threats, key=lambda x: x['time'], reverse=True)
     
+    def connection_record(self, service, attack_type, risk_level):
+        """Raw connection fields for the model's selected features"""
+        if service in ('ecr_i', 'eco_i'):
+            protocol = 'icmp'
+        elif service == 'domain_u':
+            protocol = 'udp'
+        else:
+            protocol = 'tcp'
+        high_risk = risk_level == 'HIGH'
+        return {
+            'protocol_type': protocol,
+            'service': service,
+            'flag': random.choice(['S0', 'REJ', 'RSTO']) if high_risk else 'SF',
+            'src_bytes': random.randint(1024, 50000),
+            'dst_bytes': 0 if high_risk else random.randint(0, 20000),
+            'logged_in': 0 if high_risk else 1,
+            'num_compromised': random.randint(1, 3) if attack_type == 'Rootkit' else 0,
+            'num_failed_logins': random.randint(1, 5) if attack_type == 'Brute Force' else 0
+        }
+    
     def calculate_business_impact(self):
         """Calculate business impact using your actual ROI analysis"""
         return {
@@ -413,7 +481,7 @@ class ExecutiveBriefingEngine:
 def init_dashboard_components():
     """Initialize your ML model and data connections"""
     model_interface = SecurityModelInterface()
-    data_connector = SecurityDataConnector()
+    data_connector = SecurityDataConnector(model_interface)
     briefing_engine = ExecutiveBriefingEngine(model_interface.get_model_performance())
     return model_interface, data_connector, briefing_engine
 
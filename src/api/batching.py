@@ -0,0 +1,113 @@
+"""
+Dynamic micro-batching for concurrent single-record requests.
+
+Every request hands its record to ``MicroBatcher.submit`` and awaits a
+future. One background task drains the queue: it takes the first waiting
+record, keeps collecting until ``max_batch_size`` records are queued or
+``max_wait_ms`` has passed since that first record, and scores the whole
+batch with one vectorized call on a worker thread. While a batch is being
+scored new requests keep queueing, so under load batches grow on their
+own and at low load a lone request waits at most ``max_wait_ms``. If a
+batch call raises, its records are re-scored one by one so that only the
+offending caller gets the error.
+"""
+import asyncio
+import time
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+
+
+class MicroBatcher:
+    """Gather records into batches for ``score_batch(records) -> results``."""
+
+    def __init__(self, score_batch, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.score_batch = score_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.n_batches = 0
+        self.n_records = 0
+        self._queue = None
+        self._worker = None
+
+    @property
+    def mean_batch_size(self):
+        return self.n_records / self.n_batches if self.n_batches else 0.0
+
+    def start(self):
+        """Start the batching task on the running event loop (idempotent)."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, record):
+        """Queue one record and wait for its own result."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((record, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            batch = [(record, future) for record, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            records = [record for record, _ in batch]
+            try:
+                results = await asyncio.to_thread(self.score_batch, records)
+                outcomes = [(result, None) for result in results]
+            except Exception as e:
+                if len(batch) == 1:
+                    outcomes = [(None, e)]
+                else:
+                    # Score one at a time so a bad record only fails its own caller.
+                    outcomes = await asyncio.to_thread(self._score_each, records)
+            self.n_batches += 1
+            self.n_records += len(batch)
+            for (_, future), (result, error) in zip(batch, outcomes):
+                _resolve(future, result, error)
+
+    def _score_each(self, records):
+        outcomes = []
+        for record in records:
+            try:
+                outcomes.append((self.score_batch([record])[0], None))
+            except Exception as e:
+                outcomes.append((None, e))
+        return outcomes
+
+
+def _resolve(future, result=None, error=None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
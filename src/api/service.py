@@ -0,0 +1,222 @@
+"""
+FastAPI scoring service for the security model.
+
+Serves the single-file ``ModelBundle`` (raw connection fields in, label
+and attack probability out). ``POST /predict`` takes one record; those
+requests are gathered by a ``MicroBatcher`` so that concurrent callers
+share one vectorized model call. ``POST /predict/batch`` scores a list
+the caller has already batched, and ``POST /predict/stream`` scores a
+bulk NDJSON/CSV upload as it arrives (see ``src.api.streaming``).
+
+Run with::
+
+    uvicorn src.api.service:create_app --factory --port 8000
+
+``SECURITY_MODEL_BUNDLE``, ``SCORING_MAX_BATCH`` and ``SCORING_MAX_WAIT_MS``
+override the bundle path and the batching window.
+"""
+import asyncio
+import contextlib
+import os
+
+import numpy as np
+import pandas as pd
+from fastapi import Body, FastAPI, HTTPException
+
+from src.api.batching import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, MicroBatcher
+from src.api.streaming import add_streaming_routes
+from src.api.validation import check_number
+from src.models.bundle import BUNDLE_FILENAME, ModelBundle
+from src.models.encoders import ARTIFACT_DIR
+
+ATTACK_LABEL = 'anomaly'
+MAX_REQUEST_RECORDS = 10_000
+
+
+class BundleScorer:
+    """Turns lists of raw record dicts into per-record results."""
+
+    def __init__(self, bundle):
+        self.bundle = bundle
+        self.features = list(bundle.features)
+        self.categorical = set(bundle.preprocessor.encoder.columns)
+        classes = [str(c) for c in bundle.target_classes]
+        self.attack_index = classes.index(ATTACK_LABEL) if ATTACK_LABEL in classes else 1
+
+    def validate(self, record):
+        """Raise ``ValueError`` naming the problem with one record."""
+        if not isinstance(record, dict):
+            raise ValueError("Each record must be a JSON object")
+        missing = [f for f in self.features if f not in record]
+        if missing:
+            raise ValueError(f"Missing fields: {missing}")
+        for field in self.features:
+            if field not in self.categorical:
+                check_number(field, record[field])
+
+    def frame(self, records):
+        frame = pd.DataFrame({f: [record[f] for record in records] for f in self.features})
+        for column in self.features:
+            if column in self.categorical:
+                frame[column] = frame[column].astype(str)
+            else:
+                frame[column] = pd.to_numeric(frame[column], errors="raise")
+        return frame
+
+    def score_frame(self, frame, out=None):
+        """``(labels, attack_probability, confidence)`` arrays for a frame.
+
+        ``out`` is an optional preallocated feature buffer (see
+        ``FeaturePreprocessor.allocate``) reused across batches.
+        """
+        proba = self.bundle.forest.predict_proba(self.bundle.transform(frame, out=out))
+        labels = self.bundle.target_classes[np.argmax(proba, axis=1)]
+        return labels, proba[:, self.attack_index], proba.max(axis=1)
+
+    def score(self, records):
+        labels, attack, confidence = self.score_frame(self.frame(records))
+        version = self.bundle.model_version
+        return [{'prediction': str(label), 'is_attack': str(label) == ATTACK_LABEL,
+                 'attack_probability': float(p), 'confidence': float(c),
+                 'model_version': version}
+                for label, p, c in zip(labels, attack, confidence)]
+
+
+def _load_bundle(path=None):
+    path = path or os.environ.get('SECURITY_MODEL_BUNDLE',
+                                  os.path.join(ARTIFACT_DIR, BUNDLE_FILENAME))
+    print(f"📦 Loading model bundle {path}")
+    return ModelBundle.load(path)
+
+
+def create_app(bundle=None, max_batch_size=None, max_wait_ms=None):
+    """Build the app around a ``ModelBundle`` (or the bundle on disk)."""
+    if bundle is None or isinstance(bundle, str):
+        bundle = _load_bundle(bundle)
+    if max_batch_size is None:
+        max_batch_size = int(os.environ.get('SCORING_MAX_BATCH', DEFAULT_MAX_BATCH_SIZE))
+    if max_wait_ms is None:
+        max_wait_ms = float(os.environ.get('SCORING_MAX_WAIT_MS', DEFAULT_MAX_WAIT_MS))
+    scorer = BundleScorer(bundle)
+    batcher = MicroBatcher(scorer.score, max_batch_size, max_wait_ms)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        batcher.start()
+        yield
+        await batcher.stop()
+
+    app = FastAPI(title="Network Security Scoring API", lifespan=lifespan)
+    app.state.scorer = scorer
+    app.state.batcher = batcher
+
+    @app.get("/health")
+    def health():
+        return {'status': 'ok', 'model_version': bundle.model_version,
+                'features': scorer.features}
+
+    @app.get("/stats")
+    def stats():
+        return {'batches': batcher.n_batches, 'records': batcher.n_records,
+                'mean_batch_size': batcher.mean_batch_size,
+                'max_batch_size': batcher.max_batch_size,
+                'max_wait_ms': batcher.max_wait * 1000}
+
+    @app.post("/predict")
+    async def predict(record: dict = Body(...)):
+        try:
+            scorer.validate(record)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        return await batcher.submit(record)
+
+    @app.post("/predict/batch")
+    async def predict_batch(records: list = Body(...)):
+        if len(records) > MAX_REQUEST_RECORDS:
+            raise HTTPException(status_code=413,
+                                detail=f"At most {MAX_REQUEST_RECORDS} records per request")
+        try:
+            for record in records:
+                scorer.validate(record)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        if not records:
+            return []
+        return await asyncio.to_thread(scorer.score, records)
+
+    add_streaming_routes(app, scorer)
+    return app
+
+
+async def _load_test(app, records, concurrency, n_requests):
+    """Fire ``n_requests`` single-record calls from ``concurrency`` clients."""
+    import time
+
+    import httpx
+
+    latencies = []
+    sent = 0
+
+    async def client_loop(client):
+        nonlocal sent
+        while sent < n_requests:
+            record = records[sent % len(records)]
+            sent += 1
+            start = time.perf_counter()
+            response = await client.post("/predict", json=record)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://scoring") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    await app.state.batcher.stop()
+    latencies = np.array(latencies) * 1000
+    return {'requests_per_sec': len(latencies) / elapsed,
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'mean_batch': app.state.batcher.mean_batch_size}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from sklearn.ensemble import RandomForestClassifier
+
+    from src.data.schema import apply_schema
+    from src.models.preprocessing import FeaturePreprocessor
+    from src.utils.benchmark import print_benchmark_table, synthetic_kdd_frame
+
+    parser = argparse.ArgumentParser(description="Micro-batching throughput / latency sweep")
+    parser.add_argument("--bundle", default=os.path.join(ARTIFACT_DIR, BUNDLE_FILENAME))
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--windows-ms", type=float, nargs="+", default=[0.0, 1.0, 5.0])
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    args = parser.parse_args()
+
+    frame = apply_schema(synthetic_kdd_frame(10_000))
+    if os.path.exists(args.bundle):
+        bundle = ModelBundle.load(args.bundle)
+    else:
+        print(f"⚠️ {args.bundle} not found; training the notebook's forest on synthetic data")
+        prep = FeaturePreprocessor().fit(frame)
+        y = (frame['class'] == 'normal').to_numpy().astype(int)
+        model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42,
+                                       n_jobs=-1).fit(prep.transform(frame), y)
+        bundle = ModelBundle.from_models(model, prep, ['anomaly', 'normal'])
+    records = frame[bundle.features].to_dict('records')
+    records = [{k: v.item() if hasattr(v, 'item') else v for k, v in r.items()} for r in records]
+
+    # Batch size 1 is the no-batching baseline: one model call per request.
+    settings = [(1, 0.0)] + [(args.max_batch, window) for window in args.windows_ms]
+    rows = []
+    for max_batch, window in settings:
+        for concurrency in args.concurrency:
+            app = create_app(bundle, max_batch, window)
+            stats = asyncio.run(_load_test(app, records, concurrency, args.requests))
+            rows.append({'max_batch': max_batch, 'window_ms': window,
+                         'concurrency': concurrency, **stats})
+    print_benchmark_table(f"/predict, {args.requests:,} requests per setting", rows)
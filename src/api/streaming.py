@@ -0,0 +1,322 @@
+"""
+Bulk scoring of a chunked NDJSON or CSV upload, streamed back as NDJSON.
+
+``POST /predict/stream`` reads the request body as it arrives, cuts it
+into lines, and every ``batch_size`` lines parses and scores them with one
+vectorized call on a worker thread before writing that batch's results
+to the response. At most one batch of lines, one partial line and one
+batch of results are held at a time, and both directions are
+flow-controlled by the server, so memory stays flat however large the
+upload is.
+
+Every non-empty record line (not the CSV header) gets exactly one
+output line, in order::
+
+    {"line": 2, "prediction": "anomaly", "is_attack": true, "attack_probability": 0.981}
+    {"line": 3, "error": "Missing fields: ['flag']"}
+
+A bad record is reported in place and never fails the rest of the stream.
+Clients must read the response while they upload (``curl -T- -N``
+does); one that sends the whole body first stalls once its unread
+results fill the socket buffers.
+CSV uploads (``Content-Type: text/csv`` or ``?format=csv``) need a header
+line and one record per line; extra columns in either format are ignored.
+"""
+import asyncio
+import csv
+import json
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from src.api.validation import check_number, parse_number
+
+DEFAULT_STREAM_BATCH_SIZE = 5_000
+MAX_LINE_BYTES = 64 * 1024
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_FORMATS = ("ndjson", "csv")
+
+
+class LineTooLong(ValueError):
+    pass
+
+
+class BadHeader(ValueError):
+    pass
+
+
+async def iter_line_batches(chunks, batch_size, max_line_bytes=MAX_LINE_BYTES):
+    """Group an async byte-chunk stream into lists of at most ``batch_size`` lines."""
+    pending = b""
+    batch = []
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        if len(pending) > max_line_bytes or any(len(line) > max_line_bytes for line in lines):
+            raise LineTooLong(f"A line is longer than {max_line_bytes} bytes")
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if pending.strip():
+        batch.append(pending)
+    if batch:
+        yield batch
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """``StreamingResponse`` that leaves ``receive`` to the request body.
+
+    The stock class also watches ``receive`` for a client disconnect while
+    streaming, which would swallow the upload's body messages. Here a
+    disconnect surfaces as ``ClientDisconnect`` from ``request.stream()``.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _error_line(line_no, message):
+    return json.dumps({'line': line_no, 'error': message})
+
+
+class StreamScorer:
+    """Parses and scores one stream's batches, keeping its line count and buffer."""
+
+    def __init__(self, scorer, batch_size=DEFAULT_STREAM_BATCH_SIZE, fmt="ndjson"):
+        self.scorer = scorer
+        self.features = scorer.features
+        self.batch_size = batch_size
+        self.fmt = fmt
+        self.columns = None  # CSV header
+        self.next_line = 1
+        self.numeric = [(i, f) for i, f in enumerate(self.features)
+                        if f not in scorer.categorical]
+        self.buffer = scorer.bundle.preprocessor.allocate(batch_size)
+        self._labels = {label: json.dumps(str(label)) for label in scorer.bundle.target_classes}
+        attack_label = scorer.bundle.target_classes[scorer.attack_index]
+        self._attack = {label: label == attack_label for label in scorer.bundle.target_classes}
+
+    def _parse_ndjson(self, line):
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("Each line must be a JSON object")
+        missing = [f for f in self.features if f not in record]
+        if missing:
+            raise ValueError(f"Missing fields: {missing}")
+        for _, field in self.numeric:
+            check_number(field, record[field])
+        return [record[f] for f in self.features]
+
+    def _parse_csv(self, fields):
+        if len(fields) != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} fields, got {len(fields)}")
+        row = [fields[i] for i in self._positions]
+        for i, field in self.numeric:
+            row[i] = parse_number(field, row[i])
+        return row
+
+    def _read_header(self, fields):
+        fields = [field.strip().lstrip("\ufeff") for field in fields]
+        missing = [f for f in self.features if f not in fields]
+        if missing:
+            raise BadHeader(f"CSV header is missing fields: {missing}")
+        self.columns = fields
+        self._positions = [fields.index(f) for f in self.features]
+
+    def score_batch(self, lines):
+        """Return the NDJSON output (bytes) for one batch of raw lines."""
+        out = [None] * len(lines)
+        rows, positions = [], []
+        first_line = self.next_line
+        self.next_line += len(lines)
+        if self.fmt == "csv":
+            decoded = [line.decode("utf-8", errors="replace") for line in lines]
+            parsed = enumerate(csv.reader(decoded))
+        else:
+            parsed = enumerate(lines)
+        for i, line in parsed:
+            if not line or self.fmt != "csv" and not line.strip():
+                continue
+            if self.fmt == "csv" and self.columns is None:
+                self._read_header(line)
+                continue
+            try:
+                rows.append(self._parse_csv(line) if self.fmt == "csv" else self._parse_ndjson(line))
+                positions.append(i)
+            except ValueError as e:
+                out[i] = _error_line(first_line + i, str(e))
+
+        if rows:
+            # Every row passed the same checks as /predict, so casting cannot fail.
+            frame = pd.DataFrame(rows, columns=self.features)
+            for column in self.features:
+                if column in self.scorer.categorical:
+                    frame[column] = frame[column].astype(str)
+                else:
+                    frame[column] = frame[column].astype(np.float64)
+            labels, attack, _ = self.scorer.score_frame(frame, out=self.buffer)
+            for i, label, p in zip(positions, labels, attack):
+                out[i] = (f'{{"line": {first_line + i}, "prediction": {self._labels[label]}, '
+                          f'"is_attack": {"true" if self._attack[label] else "false"}, '
+                          f'"attack_probability": {p:.6f}}}')
+        return "".join(line + "\n" for line in out if line is not None).encode("utf-8")
+
+
+async def stream_predictions(scorer, chunks, fmt="ndjson", batch_size=DEFAULT_STREAM_BATCH_SIZE,
+                             max_line_bytes=MAX_LINE_BYTES):
+    """Async generator of NDJSON result chunks for an async byte stream."""
+    stream = StreamScorer(scorer, batch_size, fmt)
+    try:
+        async for lines in iter_line_batches(chunks, batch_size, max_line_bytes):
+            yield await asyncio.to_thread(stream.score_batch, lines)
+    except (LineTooLong, BadHeader) as e:  # nothing after this point can be parsed
+        yield (_error_line(None, str(e)) + "\n").encode("utf-8")
+
+
+def add_streaming_routes(app, scorer, batch_size=DEFAULT_STREAM_BATCH_SIZE):
+    """Register ``POST /predict/stream`` on ``app``."""
+
+    @app.post("/predict/stream")
+    async def predict_stream(request: Request, format: str = None):
+        fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+        if fmt not in STREAM_FORMATS:
+            raise HTTPException(status_code=422, detail=f"format must be one of {STREAM_FORMATS}")
+        return UploadStreamingResponse(stream_predictions(scorer, request.stream(), fmt, batch_size),
+                                 media_type=NDJSON_MEDIA_TYPE)
+
+    return app
+
+
+def _synthetic_upload(n_rows, fmt, features, chunk_rows=20_000):
+    """Yield an NDJSON/CSV body of ``n_rows`` synthetic records in pieces."""
+    from src.data.schema import apply_schema
+    from src.utils.benchmark import synthetic_kdd_frame
+
+    for start in range(0, n_rows, chunk_rows):
+        frame = apply_schema(synthetic_kdd_frame(min(chunk_rows, n_rows - start), seed=start))
+        frame = frame[features]
+        if fmt == "csv":
+            yield frame.to_csv(index=False, header=start == 0).encode("utf-8")
+        else:
+            yield frame.to_json(orient="records", lines=True).encode("utf-8")
+
+
+def _post_full_duplex(host, port, path, content_type, body):
+    """Chunked POST that uploads on a thread while the caller reads the response.
+
+    A half-duplex client that sends the whole body before reading would
+    deadlock against the server's flow control once results back up.
+    """
+    import http.client
+    import socket
+    import threading
+
+    sock = socket.create_connection((host, port))
+    head = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: {content_type}\r\n"
+            "Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+
+    def upload():
+        sock.sendall(head.encode("ascii"))
+        for chunk in body:
+            sock.sendall(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        sock.sendall(b"0\r\n\r\n")
+
+    writer = threading.Thread(target=upload, daemon=True)
+    writer.start()
+    response = http.client.HTTPResponse(sock)
+    response.begin()
+    if response.status != 200:
+        raise RuntimeError(f"HTTP {response.status}: {response.read()[:200]!r}")
+    try:
+        yield from response
+    finally:
+        writer.join()
+        sock.close()
+
+
+def _stream_through_server(port, n_rows, fmt, features, server_pid):
+    """Stream a synthetic upload through the server; track its RSS."""
+    import threading
+    import time
+
+    import psutil
+
+    server = psutil.Process(server_pid)
+    baseline = server.memory_info().rss
+    peak = [baseline]
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], server.memory_info().rss)
+            time.sleep(0.02)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    results = errors = 0
+    first_result = None
+    content_type = "text/csv" if fmt == "csv" else NDJSON_MEDIA_TYPE
+    start = time.perf_counter()
+    for line in _post_full_duplex("127.0.0.1", port, "/predict/stream", content_type,
+                                  _synthetic_upload(n_rows, fmt, features)):
+        if first_result is None:
+            first_result = time.perf_counter() - start
+        results += 1
+        errors += b'"error"' in line
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    return {'format': fmt, 'rows': n_rows, 'results': results, 'errors': errors,
+            'seconds': elapsed, 'rows_per_sec': n_rows / elapsed,
+            'first_result_s': first_result, 'server_rss_growth_mb': (peak[0] - baseline) / 2**20}
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import subprocess
+    import sys
+    import tempfile
+    import time
+
+    import httpx
+
+    from src.models.bundle import BUNDLE_FILENAME, ModelBundle
+    from src.models.encoders import ARTIFACT_DIR
+    from src.utils.benchmark import print_benchmark_table
+
+    parser = argparse.ArgumentParser(description="Stream bulk uploads through /predict/stream")
+    parser.add_argument("--bundle", default=os.path.join(ARTIFACT_DIR, BUNDLE_FILENAME))
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--formats", nargs="+", default=["ndjson", "csv"])
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.bundle):
+        sys.exit(f"❌ {args.bundle} not found; build it with python -m src.models.bundle")
+    features = ModelBundle.load(args.bundle).features
+    url = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ, SECURITY_MODEL_BUNDLE=args.bundle)
+    with tempfile.TemporaryFile() as log:
+        server = subprocess.Popen([sys.executable, "-m", "uvicorn", "src.api.service:create_app",
+                                   "--factory", "--port", str(args.port)],
+                                  env=env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            for _ in range(100):
+                try:
+                    httpx.get(f"{url}/health").raise_for_status()
+                    break
+                except httpx.HTTPError:
+                    time.sleep(0.1)
+            rows = [_stream_through_server(args.port, n_rows, fmt, features, server.pid)
+                    for fmt in args.formats for n_rows in args.rows]
+        finally:
+            server.terminate()
+            server.wait()
+    print_benchmark_table("Bulk streaming scoring (uvicorn, one upload at a time)", rows)
@@ -0,0 +1,33 @@
+"""
+Field checks shared by the scoring endpoints.
+
+``/predict``, ``/predict/batch`` and ``/predict/stream`` all accept a
+numeric feature only as a finite number, so a record rejected by one is
+rejected by all of them.
+"""
+import math
+
+
+def check_number(field, value):
+    """Return ``value`` if it is a finite JSON number, else raise ``ValueError``."""
+    # JSON numbers only: "123" or true would reach the scaler as str / bool.
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Field {field!r} must be a finite number, got {value!r}")
+    try:
+        finite = math.isfinite(value)
+    except (OverflowError, TypeError):  # e.g. 10**400 does not fit a float
+        finite = False
+    if not finite:
+        raise ValueError(f"Field {field!r} must be a finite number, got {value!r}")
+    return value
+
+
+def parse_number(field, text):
+    """Parse one CSV field as a finite number, or raise ``ValueError``."""
+    try:
+        value = float(text)
+    except ValueError:
+        value = math.nan
+    if not math.isfinite(value):
+        raise ValueError(f"Field {field!r} must be a finite number, got {text!r}")
+    return value
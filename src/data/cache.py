@@ -0,0 +1,277 @@
+"""
+Columnar on-disk cache for parsed KDD CSV files.
+
+The first load of a CSV writes every column as a raw little-endian array
+(string columns as integer codes plus a category list) next to a JSON
+manifest. Later loads memory-map those arrays instead of re-parsing text,
+so start-up cost no longer grows with the CSV size.
+
+The cache is keyed on the source file's size, mtime and content hash and
+is rebuilt whenever the source changes.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+CACHE_ROOT = "data/processed/kdd_cache"
+CACHE_FORMAT_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+HASH_BLOCK_SIZE = 1 << 20
+CODE_DTYPE = np.dtype("int32")
+
+
+def file_fingerprint(filepath, with_hash=True):
+    """Return size, mtime and (optionally) the blake2b digest of a file."""
+    stat = os.stat(filepath)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(filepath, "rb") as handle:
+            for block in iter(lambda: handle.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        fingerprint['hash'] = digest.hexdigest()
+    return fingerprint
+
+
+def cache_dir_for(filepath, cache_root=CACHE_ROOT, variant=""):
+    """Cache directory for ``filepath``; distinct sources never collide.
+
+    ``variant`` separates caches of the same source parsed differently
+    (e.g. with and without the declared dtype schema).
+    """
+    source = os.path.abspath(filepath)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    tag = hashlib.blake2b(f"{source}|{variant}".encode("utf-8"), digest_size=4).hexdigest()
+    return os.path.join(cache_root, f"{stem}-{tag}")
+
+
+def read_manifest(cache_dir):
+    """Return the cache manifest, or None if the cache is missing/corrupt."""
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME)) as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != CACHE_FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w") as handle:
+        json.dump(manifest, handle, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def fresh_manifest(filepath, cache_dir):
+    """Return the manifest if the cache still matches ``filepath``.
+
+    Size and mtime are checked first; the content hash is only computed
+    when the mtime moved (e.g. a touched or re-copied file), in which case
+    a matching hash revalidates the cache without rebuilding it.
+    """
+    manifest = read_manifest(cache_dir)
+    if manifest is None:
+        return None
+    source = manifest['source']
+    current = file_fingerprint(filepath, with_hash=False)
+    if current['size'] != source['size']:
+        return None
+    if current['mtime_ns'] == source['mtime_ns']:
+        return manifest
+
+    current = file_fingerprint(filepath)
+    if current['hash'] != source['hash']:
+        return None
+    manifest['source'] = current
+    _write_manifest(cache_dir, manifest)
+    return manifest
+
+
+class _ColumnWriter:
+    """Appends one column's chunks to a raw array file."""
+
+    def __init__(self, cache_dir, index, name):
+        self.name = name
+        self.filename = f"col_{index:03d}.bin"
+        self.path = os.path.join(cache_dir, self.filename)
+        self.kind = None
+        self.dtype = None
+        self.categories = []
+        self._category_codes = {}
+
+    def append(self, series):
+        if self.kind is None:
+            numeric = (pd.api.types.is_numeric_dtype(series.dtype)
+                       or pd.api.types.is_bool_dtype(series.dtype))
+            self.kind = "numeric" if numeric else "categorical"
+            self.dtype = np.dtype(series.dtype) if numeric else CODE_DTYPE
+
+        if self.kind == "categorical":
+            values = self._encode(series)
+        else:
+            values = self._numeric(series)
+        with open(self.path, "ab") as handle:
+            values.tofile(handle)
+
+    def _encode(self, series):
+        local_codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        mapping = np.empty(len(uniques) + 1, dtype=CODE_DTYPE)
+        mapping[-1] = -1
+        for position, value in enumerate(uniques):
+            value = str(value)
+            code = self._category_codes.get(value)
+            if code is None:
+                code = len(self.categories)
+                self._category_codes[value] = code
+                self.categories.append(value)
+            mapping[position] = code
+        return mapping[local_codes]
+
+    def _numeric(self, series):
+        if not (pd.api.types.is_numeric_dtype(series.dtype)
+                or pd.api.types.is_bool_dtype(series.dtype)):
+            raise ValueError(f"Column {self.name!r} mixes numeric and text values")
+        values = series.to_numpy()
+        promoted = np.result_type(self.dtype, values.dtype)
+        if promoted != self.dtype:
+            # An int column met a NaN (or similar) in a later chunk: widen
+            # what was already written so the whole file keeps one dtype.
+            if os.path.exists(self.path):
+                np.fromfile(self.path, dtype=self.dtype).astype(promoted).tofile(self.path)
+            self.dtype = promoted
+        return np.ascontiguousarray(values, dtype=self.dtype)
+
+    def describe(self):
+        entry = {'name': self.name, 'file': self.filename, 'kind': self.kind,
+                 'dtype': self.dtype.str}
+        if self.kind == "categorical":
+            entry['categories'] = self.categories
+        return entry
+
+
+def write_cache(chunks, cache_dir, fingerprint):
+    """Stream ``chunks`` into a new cache at ``cache_dir``.
+
+    Writes into a temporary directory first and swaps it in at the end, so
+    an interrupted build never leaves a half-written cache behind.
+    """
+    tmp_dir = cache_dir + ".building"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        writers = None
+        rows = 0
+        for chunk in chunks:
+            if writers is None:
+                writers = [_ColumnWriter(tmp_dir, i, name)
+                           for i, name in enumerate(chunk.columns)]
+            for writer in writers:
+                writer.append(chunk[writer.name])
+            rows += len(chunk)
+
+        manifest = {
+            'version': CACHE_FORMAT_VERSION,
+            'source': fingerprint,
+            'rows': rows,
+            'columns': [w.describe() for w in writers or []],
+        }
+        _write_manifest(tmp_dir, manifest)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.replace(tmp_dir, cache_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return manifest
+
+
+def read_cache(cache_dir, manifest=None, columns=None):
+    """Open a cache as a DataFrame backed by memory-mapped column files.
+
+    Pages are mapped copy-on-write, so callers may modify the frame without
+    touching the files on disk.
+    """
+    if manifest is None:
+        manifest = read_manifest(cache_dir)
+        if manifest is None:
+            raise FileNotFoundError(f"No valid cache in {cache_dir}")
+    rows = manifest['rows']
+    data = {}
+    for entry in manifest['columns']:
+        if columns is not None and entry['name'] not in columns:
+            continue
+        dtype = np.dtype(entry['dtype'])
+        if rows:
+            values = np.memmap(os.path.join(cache_dir, entry['file']),
+                               dtype=dtype, mode="c", shape=(rows,)).view(np.ndarray)
+        else:
+            values = np.empty(0, dtype=dtype)
+        if entry['kind'] == "categorical":
+            values = pd.Categorical.from_codes(values, categories=entry['categories'])
+        data[entry['name']] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def load_with_cache(filepath, chunk_factory, cache_root=CACHE_ROOT, variant=""):
+    """Return the frame for ``filepath``, building its cache on first use.
+
+    ``chunk_factory`` is called with no arguments on a cache miss and must
+    return an iterator of DataFrame chunks for the source file.
+    """
+    cache_dir = cache_dir_for(filepath, cache_root, variant)
+    manifest = fresh_manifest(filepath, cache_dir)
+    if manifest is None:
+        fingerprint = file_fingerprint(filepath)
+        manifest = write_cache(chunk_factory(), cache_dir, fingerprint)
+    return read_cache(cache_dir, manifest)
+
+
+def _bench_parse(filepath):
+    frame = pd.read_csv(filepath)
+    return frame.shape
+
+
+def _bench_cached(filepath, cache_root, scan):
+    from src.data.ingestion import iter_kdd_chunks
+
+    frame = load_with_cache(filepath, lambda: iter_kdd_chunks(filepath=filepath),
+                            cache_root, variant="schema")
+    if scan:
+        frame.select_dtypes("number").sum()
+    return frame.shape
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    from src.utils.benchmark import print_benchmark_table, run_isolated, write_synthetic_kdd_csv
+
+    parser = argparse.ArgumentParser(description="CSV parse vs columnar cache load")
+    parser.add_argument("csv", nargs="?", help="KDD CSV to benchmark (default: synthetic)")
+    parser.add_argument("--rows", type=int, default=2_000_000,
+                        help="rows of synthetic data when no CSV is given")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = args.csv or write_synthetic_kdd_csv(
+            os.path.join(workdir, "kdd_synthetic.csv"), args.rows)
+        cache_root = os.path.join(workdir, "cache")
+
+        rows = []
+        for label, fn, extra in [
+            ("read_csv (no cache)", _bench_parse, ()),
+            ("first load (build cache)", _bench_cached, (cache_root, False)),
+            ("cached load (mmap)", _bench_cached, (cache_root, False)),
+            ("cached load + numeric scan", _bench_cached, (cache_root, True)),
+        ]:
+            stats = run_isolated(fn, csv_path, *extra)
+            rows.append({'mode': label, 'rows': stats['result'][0],
+                         'seconds': stats['seconds'],
+                         'peak_rss_mb': stats['peak_rss_mb']})
+        print_benchmark_table(f"KDD load benchmark: {csv_path}", rows)
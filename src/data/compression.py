@@ -0,0 +1,226 @@
+"""
+Streaming decompression for compressed CSV inputs.
+
+``open_decompressed`` returns a readable binary stream over a .gz, .bz2,
+.xz or .zst file. By default inflation runs on a background thread that
+keeps a few decompressed blocks queued ahead of the reader, so the CSV
+parser and the decompressor (both of which release the GIL) overlap
+instead of taking turns. Nothing is ever written to disk.
+"""
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import threading
+
+BLOCK_SIZE = 1 << 20
+QUEUE_DEPTH = 8
+
+_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+    '.zst': 'zstd',
+    '.zstd': 'zstd',
+}
+_MAGIC = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+]
+COMPRESSED_EXTENSIONS = tuple(_EXTENSIONS)
+
+
+def detect_compression(filepath):
+    """Return the codec name for ``filepath`` or None if it is plain text."""
+    lowered = str(filepath).lower()
+    for extension, codec in _EXTENSIONS.items():
+        if lowered.endswith(extension):
+            return codec
+    try:
+        with open(filepath, "rb") as handle:
+            head = handle.read(6)
+    except OSError:
+        return None
+    for magic, codec in _MAGIC:
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def _open_codec(raw, codec):
+    if codec == 'gzip':
+        return gzip.GzipFile(fileobj=raw)
+    if codec == 'bz2':
+        return bz2.BZ2File(raw)
+    if codec == 'xz':
+        return lzma.LZMAFile(raw)
+    if codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("Reading .zst files requires the 'zstandard' package "
+                              "(pip install zstandard)") from e
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_size=BLOCK_SIZE)
+    raise ValueError(f"Unsupported compression: {codec}")
+
+
+class _ThreadedDecompressor(io.RawIOBase):
+    """Raw stream fed by a producer thread that inflates blocks ahead."""
+
+    def __init__(self, filepath, codec, block_size, depth):
+        super().__init__()
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._buffer = memoryview(b"")
+        self._done = False
+        self._thread = threading.Thread(target=self._produce,
+                                        args=(filepath, codec, block_size),
+                                        name="decompress", daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, filepath, codec, block_size):
+        try:
+            with open(filepath, "rb") as raw, _open_codec(raw, codec) as stream:
+                while not self._stop.is_set():
+                    block = stream.read(block_size)
+                    if not block or not self._put(block):
+                        break
+        except BaseException as e:  # surfaced to the reading thread
+            self._put(e)
+        finally:
+            self._put(None)
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while not self._buffer:
+            if self._done:
+                return 0
+            item = self._queue.get()
+            if item is None:
+                self._done = True
+                return 0
+            if isinstance(item, BaseException):
+                self._done = True
+                raise item
+            self._buffer = memoryview(item)
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            while self._thread.is_alive():
+                try:
+                    self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self._thread.join()
+        super().close()
+
+
+def open_decompressed(filepath, codec=None, threaded=True, block_size=BLOCK_SIZE,
+                      depth=QUEUE_DEPTH):
+    """Open a compressed file as a buffered binary stream of its contents.
+
+    ``codec`` is detected from the extension / magic bytes when omitted.
+    With ``threaded`` up to ``depth`` blocks of ``block_size`` bytes are
+    inflated ahead of the reader on a background thread.
+    """
+    codec = codec or detect_compression(filepath)
+    if codec is None:
+        raise ValueError(f"{filepath} is not a recognised compressed file")
+    if not threaded:
+        raw = open(filepath, "rb")
+        try:
+            return io.BufferedReader(_open_codec(raw, codec), buffer_size=block_size)
+        except BaseException:
+            raw.close()
+            raise
+    return io.BufferedReader(_ThreadedDecompressor(filepath, codec, block_size, depth),
+                             buffer_size=block_size)
+
+
+def _bench_stream(filepath, threaded):
+    from src.data.ingestion import iter_kdd_chunks
+
+    rows = 0
+    for chunk in iter_kdd_chunks(filepath=filepath, threaded_decompression=threaded):
+        rows += len(chunk)
+    return rows
+
+
+def _bench_decompress_then_read(filepath, workdir):
+    import os
+    import shutil
+
+    from src.data.ingestion import iter_kdd_chunks
+
+    target = os.path.join(workdir, "decompressed.csv")
+    with open_decompressed(filepath, threaded=False) as source, open(target, "wb") as out:
+        shutil.copyfileobj(source, out, BLOCK_SIZE)
+    rows = 0
+    for chunk in iter_kdd_chunks(filepath=target):
+        rows += len(chunk)
+    os.remove(target)
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import shutil
+    import tempfile
+
+    from src.utils.benchmark import print_benchmark_table, run_isolated, write_synthetic_kdd_csv
+
+    parser = argparse.ArgumentParser(description="Compressed KDD input: streaming vs decompress-then-read")
+    parser.add_argument("files", nargs="*", help="compressed CSVs (default: synthetic gz/bz2/zst)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        files = args.files
+        if not files:
+            plain = write_synthetic_kdd_csv(os.path.join(workdir, "kdd.csv"), args.rows)
+            openers = [("kdd.csv.gz", gzip.open), ("kdd.csv.bz2", bz2.open)]
+            try:
+                import zstandard
+                openers.append(("kdd.csv.zst",
+                                lambda p, m: zstandard.ZstdCompressor().stream_writer(open(p, m))))
+            except ImportError:
+                pass
+            for name, opener in openers:
+                with open(plain, "rb") as source, opener(os.path.join(workdir, name), "wb") as out:
+                    shutil.copyfileobj(source, out, BLOCK_SIZE)
+                files.append(os.path.join(workdir, name))
+            os.remove(plain)
+
+        rows = []
+        for path in files:
+            for label, fn, extra in [
+                ("decompress to disk, then read", _bench_decompress_then_read, (workdir,)),
+                ("stream, inline inflate", _bench_stream, (False,)),
+                ("stream, threaded inflate", _bench_stream, (True,)),
+            ]:
+                stats = run_isolated(fn, path, *extra)
+                rows.append({'file': os.path.basename(path), 'mode': label,
+                             'rows': stats['result'], 'seconds': stats['seconds'],
+                             'peak_rss_mb': stats['peak_rss_mb']})
+        print_benchmark_table("Compressed input benchmark", rows)
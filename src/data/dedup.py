@@ -0,0 +1,170 @@
+"""
+Streaming duplicate-record elimination.
+
+KDD-style traffic is dominated by identical records (smurf/neptune
+floods). ``StreamingDeduplicator`` fingerprints every row with a 64-bit
+hash, passes each distinct row through once, and keeps how often it was
+seen so the count can be used as a sample weight.
+
+Only the fingerprints and counts of distinct rows are retained (an
+open-addressing table of 16-byte cells kept at most half full, plus an
+8-byte count each), never the duplicates themselves, so memory grows with
+the number of distinct records rather than the input. Both grow by
+doubling, so each chunk costs time in proportion to the chunk only.
+"""
+import numpy as np
+import pandas as pd
+
+WEIGHT_COLUMN = 'sample_weight'
+INITIAL_CAPACITY = 1 << 16
+
+
+def row_fingerprints(chunk, columns=None):
+    """64-bit hash of every row's values (index excluded).
+
+    Categoricals are hashed by value, so the same row gets the same
+    fingerprint whatever categories its chunk happened to infer.
+    """
+    if columns is not None:
+        chunk = chunk[columns]
+    return pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+
+
+class FingerprintTable:
+    """Growing hash table from 64-bit fingerprints to slot numbers.
+
+    Linear probing over parallel key/slot arrays, vectorized across a
+    batch of keys. The fingerprints are already hashes, so their low bits
+    pick the starting cell.
+    """
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        capacity = 1 << max(1, int(capacity) - 1).bit_length()
+        self._keys = np.zeros(capacity, dtype=np.uint64)
+        self._slots = np.full(capacity, -1, dtype=np.int64)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _probe(self, keys):
+        """Cell holding each key, or the empty cell where it would go."""
+        mask = len(self._keys) - 1
+        cells = (keys & np.uint64(mask)).astype(np.int64)
+        todo = np.arange(len(keys))
+        while len(todo):
+            at = cells[todo]
+            done = (self._slots[at] < 0) | (self._keys[at] == keys[todo])
+            todo = todo[~done]
+            cells[todo] = (cells[todo] + 1) & mask
+        return cells
+
+    def lookup(self, keys):
+        """Slot of every key, ``-1`` for keys not in the table."""
+        return self._slots[self._probe(keys)]
+
+    def insert(self, keys, slots):
+        """Add distinct ``keys`` that are not in the table yet."""
+        if 2 * (self.size + len(keys)) > len(self._keys):
+            self._grow(self.size + len(keys))
+        while len(keys):
+            cells = self._probe(keys)
+            # Keys racing for the same empty cell: the first wins, the
+            # rest probe on past it in the next round.
+            _, first = np.unique(cells, return_index=True)
+            self._keys[cells[first]] = keys[first]
+            self._slots[cells[first]] = slots[first]
+            self.size += len(first)
+            rest = np.ones(len(keys), dtype=bool)
+            rest[first] = False
+            keys, slots = keys[rest], slots[rest]
+
+    def _grow(self, needed):
+        used = self._slots >= 0
+        keys, slots = self._keys[used], self._slots[used]
+        capacity = len(self._keys)
+        while 2 * needed > capacity:
+            capacity *= 2
+        self._keys = np.zeros(capacity, dtype=np.uint64)
+        self._slots = np.full(capacity, -1, dtype=np.int64)
+        self.size = 0
+        self.insert(keys, slots)
+
+
+class StreamingDeduplicator:
+    """Pass distinct rows through once and count how often each occurred."""
+
+    def __init__(self, columns=None):
+        self.columns = columns
+        self.rows_seen = 0
+        self._table = FingerprintTable()
+        self._counts = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        self._n_unique = 0
+
+    def update(self, chunk):
+        """Return the rows of ``chunk`` that were never seen before.
+
+        Rows come back in first-seen order; their running counts are in
+        :meth:`weights`, aligned with the concatenation of all returned rows.
+        """
+        self.rows_seen += len(chunk)
+        hashes = row_fingerprints(chunk, self.columns)
+        codes, uniques = pd.factorize(hashes)
+        counts = np.bincount(codes, minlength=len(uniques))
+
+        slots = self._table.lookup(uniques)
+        known = slots >= 0
+        self._counts[slots[known]] += counts[known]
+
+        new = ~known
+        n_new = int(new.sum())
+        start = self._n_unique
+        if start + n_new > len(self._counts):
+            grown = np.zeros(max(2 * len(self._counts), start + n_new), dtype=np.int64)
+            grown[:start] = self._counts[:start]
+            self._counts = grown
+        self._table.insert(uniques[new], np.arange(start, start + n_new))
+        self._counts[start:start + n_new] = counts[new]
+        self._n_unique += n_new
+        _, first_rows = np.unique(codes, return_index=True)
+        return chunk.iloc[first_rows[new]]
+
+    def weights(self):
+        """Occurrence count of every distinct row emitted so far."""
+        return self._counts[:self._n_unique].copy()
+
+    @property
+    def unique_rows(self):
+        return self._n_unique
+
+    def summary(self):
+        return {
+            'rows_seen': self.rows_seen,
+            'unique_rows': self.unique_rows,
+            'duplicate_fraction': 1 - self.unique_rows / self.rows_seen if self.rows_seen else 0.0,
+        }
+
+
+def deduplicate(chunks, columns=None):
+    """Collapse a stream of chunks into distinct rows plus a weight column.
+
+    ``columns`` restricts which columns define a duplicate (e.g. the
+    selected features and the label); all columns are kept in the output.
+    """
+    from src.data.ingestion import concat_chunks
+
+    dedup = StreamingDeduplicator(columns)
+    unique = concat_chunks(dedup.update(chunk) for chunk in chunks)
+    unique[WEIGHT_COLUMN] = dedup.weights().astype(np.uint32)
+    return unique
+
+
+def iter_frame_chunks(df, chunksize):
+    """Slice an in-memory (or memory-mapped) frame into fixed-size chunks."""
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def deduplicate_frame(df, columns=None, chunksize=100_000):
+    """``deduplicate`` for a frame that is already loaded."""
+    return deduplicate(iter_frame_chunks(df, chunksize), columns=columns)
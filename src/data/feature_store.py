@@ -0,0 +1,179 @@
+"""
+Memory-mapped store for the encoded float32 feature matrix.
+
+A store is a directory with the row-major float32 matrix, the encoded
+labels, optional sample weights and a small ``meta.json`` header (shape,
+feature names, label classes, free-form metadata). Opening a store maps
+the arrays read-only instead of loading them, so training, evaluation and
+batch scoring share one copy of the pages, including across worker
+processes: a pickled ``FeatureStore`` carries only its path.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+
+STORE_FORMAT_VERSION = 1
+META_NAME = "meta.json"
+FEATURES_NAME = "features.f32"
+LABELS_NAME = "labels.i32"
+WEIGHTS_NAME = "weights.f32"
+FEATURE_DTYPE = np.dtype("<f4")
+LABEL_DTYPE = np.dtype("<i4")
+WEIGHT_DTYPE = np.dtype("<f4")
+
+
+def _map(path, dtype, shape, mode="r"):
+    if not shape[0]:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, shape=shape)
+
+
+class FeatureStore:
+    """Read-only view of a feature store directory."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(os.path.join(self.path, META_NAME)) as handle:
+            self.meta = json.load(handle)
+        if self.meta.get('version') != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature store version in {self.path}")
+        self._X = self._y = self._weights = None
+
+    def __reduce__(self):
+        # Ship the path, not the arrays, to worker processes.
+        return (FeatureStore, (self.path,))
+
+    def __len__(self):
+        return self.meta['n_rows']
+
+    @property
+    def feature_names(self):
+        return list(self.meta['feature_names'])
+
+    @property
+    def classes(self):
+        return self.meta.get('classes')
+
+    @property
+    def shape(self):
+        return (self.meta['n_rows'], len(self.meta['feature_names']))
+
+    @property
+    def X(self):
+        if self._X is None:
+            self._X = _map(os.path.join(self.path, FEATURES_NAME), FEATURE_DTYPE, self.shape)
+        return self._X
+
+    @property
+    def y(self):
+        if self._y is None and self.meta['has_labels']:
+            self._y = _map(os.path.join(self.path, LABELS_NAME), LABEL_DTYPE, (len(self),))
+        return self._y
+
+    @property
+    def weights(self):
+        if self._weights is None and self.meta['has_weights']:
+            self._weights = _map(os.path.join(self.path, WEIGHTS_NAME), WEIGHT_DTYPE, (len(self),))
+        return self._weights
+
+    def iter_batches(self, batch_size):
+        """Yield ``(X, y, weights)`` views of consecutive row ranges."""
+        for start in range(0, len(self), batch_size):
+            stop = start + batch_size
+            yield (self.X[start:stop],
+                   None if self.y is None else self.y[start:stop],
+                   None if self.weights is None else self.weights[start:stop])
+
+
+class FeatureStoreWriter:
+    """Append encoded chunks to a new store; ``close()`` publishes it.
+
+    Rows are streamed to disk as they arrive, so a store larger than RAM
+    can be built from the chunked ingestion path.
+    """
+
+    def __init__(self, path, feature_names, classes=None, metadata=None):
+        self.path = str(path)
+        self.tmp_path = self.path + ".building"
+        self.feature_names = list(feature_names)
+        self.classes = None if classes is None else [str(c) for c in classes]
+        self.metadata = dict(metadata or {})
+        self.n_rows = 0
+        self.has_labels = None
+        self.has_weights = None
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+
+    def append(self, X, y=None, weights=None):
+        X = np.ascontiguousarray(X, dtype=FEATURE_DTYPE)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected a (n, {len(self.feature_names)}) matrix, got {X.shape}")
+        if self.has_labels is None:
+            self.has_labels = y is not None
+            self.has_weights = weights is not None
+        if (y is not None) != self.has_labels or (weights is not None) != self.has_weights:
+            raise ValueError("Every chunk must provide the same labels/weights arrays")
+
+        self._write(FEATURES_NAME, X)
+        if y is not None:
+            self._write(LABELS_NAME, np.asarray(y, dtype=LABEL_DTYPE))
+        if weights is not None:
+            self._write(WEIGHTS_NAME, np.asarray(weights, dtype=WEIGHT_DTYPE))
+        self.n_rows += len(X)
+
+    def _write(self, name, values):
+        with open(os.path.join(self.tmp_path, name), "ab") as handle:
+            values.tofile(handle)
+
+    def close(self):
+        meta = {
+            'version': STORE_FORMAT_VERSION,
+            'n_rows': self.n_rows,
+            'feature_names': self.feature_names,
+            'feature_dtype': FEATURE_DTYPE.str,
+            'classes': self.classes,
+            'has_labels': bool(self.has_labels),
+            'has_weights': bool(self.has_weights),
+            'metadata': self.metadata,
+        }
+        with open(os.path.join(self.tmp_path, META_NAME), "w") as handle:
+            json.dump(meta, handle, indent=1)
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self.tmp_path, self.path)
+        return FeatureStore(self.path)
+
+    def abort(self):
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.store = self.close()
+        return False
+
+
+def write_feature_store(path, X, y=None, feature_names=None, classes=None,
+                        weights=None, metadata=None):
+    """Persist an already-encoded matrix (array or DataFrame) as a store.
+
+    ``classes`` is typically ``target_encoder.classes_`` so that encoded
+    labels can be mapped back to ``normal`` / ``anomaly``.
+    """
+    if feature_names is None:
+        feature_names = list(getattr(X, 'columns', range(np.shape(X)[1])))
+    with FeatureStoreWriter(path, [str(f) for f in feature_names], classes,
+                            metadata) as writer:
+        writer.append(np.asarray(X), None if y is None else np.asarray(y),
+                      None if weights is None else np.asarray(weights))
+    return writer.store
+
+
+def open_feature_store(path):
+    """Open a store for zero-copy reading."""
+    return FeatureStore(path)
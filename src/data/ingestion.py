@@ -1,17 +1,102 @@
 """
+Data ingestion for the KDD Cup 1999 network connection dataset.
+"""
 import pandas as pd
 import numpy as np
 import os
 
-def load_kdd_data(dataset_type="test"):
-    """Load KDD Cup 1999 dataset."""
+from src.data.cache import CACHE_ROOT, load_with_cache
+from src.data.compression import detect_compression, open_decompressed
+from src.data.dedup import deduplicate as dedup_chunks, deduplicate_frame
+from src.data.schema import apply_schema as _apply_schema, read_csv_dtypes
+from src.data.validation import validate_chunk
+
+KDD_DATA_DIR = "data/raw/kdd_cup_1999"
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def resolve_kdd_path(dataset_type="test"):
+    """Return the CSV path for the train or test split."""
     if dataset_type == "test":
-        filepath = "data/raw/kdd_cup_1999/Test_data.csv"
-    else:
-        filepath = "data/raw/kdd_cup_1999/Train_data.csv"
-    
+        return os.path.join(KDD_DATA_DIR, "Test_data.csv")
+    return os.path.join(KDD_DATA_DIR, "Train_data.csv")
+
+
+def iter_kdd_chunks(dataset_type="test", chunksize=DEFAULT_CHUNK_SIZE,
+                    filepath=None, usecols=None, apply_schema=True,
+                    threaded_decompression=True):
+    """Stream the KDD dataset as DataFrames of at most ``chunksize`` rows.
+
+    Only one chunk is parsed and held at a time, so peak memory is bounded
+    by the chunk size rather than the file size. With ``apply_schema`` each
+    chunk is parsed into the compact dtypes declared in ``src.data.schema``.
+    Compressed files (.gz, .bz2, .xz, .zst) are inflated on the fly, on a
+    background thread unless ``threaded_decompression`` is False.
+    """
+    if filepath is None:
+        filepath = resolve_kdd_path(dataset_type)
+    dtype = read_csv_dtypes() if apply_schema else None
+
+    codec = detect_compression(filepath)
+    source = filepath
+    if codec is not None:
+        source = open_decompressed(filepath, codec, threaded=threaded_decompression)
+    try:
+        with pd.read_csv(source, chunksize=chunksize, usecols=usecols,
+                         dtype=dtype) as reader:
+            for chunk in reader:
+                yield _apply_schema(chunk) if apply_schema else chunk
+    finally:
+        if codec is not None:
+            source.close()
+
+
+def concat_chunks(chunks):
+    """Concatenate streamed chunks into one frame with a fresh index.
+
+    Each chunk infers its own categories, so categorical columns are first
+    unified; otherwise ``pd.concat`` would fall back to object dtype.
+    """
+    chunks = [chunk.copy(deep=False) for chunk in chunks]
+    if not chunks:
+        return pd.DataFrame()
+    for column in chunks[0].columns:
+        if isinstance(chunks[0][column].dtype, pd.CategoricalDtype):
+            categories = pd.api.types.union_categoricals(
+                [chunk[column] for chunk in chunks]).categories
+            dtype = pd.CategoricalDtype(categories)
+            for chunk in chunks:
+                chunk[column] = chunk[column].astype(dtype)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def load_kdd_data(dataset_type="test", filepath=None, chunksize=DEFAULT_CHUNK_SIZE,
+                  use_cache=True, cache_root=CACHE_ROOT, apply_schema=True,
+                  deduplicate=False):
+    """Load KDD Cup 1999 dataset.
+
+    With ``use_cache`` the CSV is parsed once into a columnar cache under
+    ``cache_root`` and later loads memory-map it instead of re-parsing.
+    With ``deduplicate`` identical rows are collapsed into one and their
+    occurrence count is returned in a ``sample_weight`` column.
+    """
+    if filepath is None:
+        filepath = resolve_kdd_path(dataset_type)
+
+    def chunks():
+        return iter_kdd_chunks(dataset_type, chunksize=chunksize, filepath=filepath,
+                               apply_schema=apply_schema)
+
     try:
-        data = pd.read_csv(filepath)
+        if use_cache:
+            variant = "schema" if apply_schema else "raw"
+            data = load_with_cache(filepath, chunks, cache_root, variant=variant)
+            if deduplicate:
+                data = deduplicate_frame(data, chunksize=chunksize)
+        elif deduplicate:
+            data = dedup_chunks(chunks())
+        else:
+            data = concat_chunks(chunks())
         print(f"? Loaded {dataset_type} data: {data.shape}")
         return data
     except Exception as e:
@@ -19,11 +104,18 @@ def load_kdd_data(dataset_type="test"):
         return None
 
 def validate_data_structure(df):
-    """Validate basic data structure."""
+    """Validate basic data structure.
+
+    In-memory shortcut for ``src.data.validation``; use
+    ``validate_kdd_file`` to check a file chunk by chunk instead.
+    """
+    report = validate_chunk(df)
     validation = {
         'shape': df.shape,
         'columns': len(df.columns),
-        'missing_values': df.isnull().sum().sum()
+        'missing_values': sum(report.null_counts.values()),
+        'valid': report.valid,
+        'errors': report.errors(),
     }
     return validation
 
@@ -0,0 +1,153 @@
+"""
+Declared column schema for the 42 KDD Cup 1999 columns.
+
+``pd.read_csv`` infers int64/float64/object for every column, which makes
+the full 4.9M-row KDD set several GB. Almost every KDD field is a small
+counter, a 0/1 flag, a rate in [0, 1] or a low-cardinality string, so the
+schema below stores them as uint8/uint16/uint32, float32 and categoricals.
+"""
+import numpy as np
+import pandas as pd
+
+KDD_COLUMNS = [
+    'duration', 'protocol_type', 'service', 'flag', 'src_bytes', 'dst_bytes',
+    'land', 'wrong_fragment', 'urgent', 'hot', 'num_failed_logins', 'logged_in',
+    'num_compromised', 'root_shell', 'su_attempted', 'num_root',
+    'num_file_creations', 'num_shells', 'num_access_files', 'num_outbound_cmds',
+    'is_host_login', 'is_guest_login', 'count', 'srv_count', 'serror_rate',
+    'srv_serror_rate', 'rerror_rate', 'srv_rerror_rate', 'same_srv_rate',
+    'diff_srv_rate', 'srv_diff_host_rate', 'dst_host_count', 'dst_host_srv_count',
+    'dst_host_same_srv_rate', 'dst_host_diff_srv_rate',
+    'dst_host_same_src_port_rate', 'dst_host_srv_diff_host_rate',
+    'dst_host_serror_rate', 'dst_host_srv_serror_rate', 'dst_host_rerror_rate',
+    'dst_host_srv_rerror_rate', 'class',
+]
+
+# Low-cardinality strings. Vocabularies stay open (new services keep
+# appearing in live traffic), so these are plain, unfixed categoricals.
+CATEGORICAL_COLUMNS = ['protocol_type', 'service', 'flag', 'class']
+
+# Values seen in the KDD Cup 1999 data, for reference and validation.
+KNOWN_CATEGORIES = {
+    'protocol_type': ['tcp', 'udp', 'icmp'],
+    'flag': ['SF', 'S0', 'REJ', 'RSTR', 'RSTO', 'SH', 'S1', 'S2', 'S3', 'OTH', 'RSTOS0'],
+    'class': ['normal', 'anomaly'],
+}
+
+RATE_COLUMNS = [c for c in KDD_COLUMNS if c.endswith('rate')]
+
+# Counters and flags, sized from the KDD value ranges with headroom.
+INTEGER_COLUMNS = {
+    'duration': 'uint32',            # seconds, max 58,329 in KDD
+    'src_bytes': 'uint32',           # max ~1.4e9
+    'dst_bytes': 'uint32',           # max ~1.3e9
+    'land': 'uint8',
+    'wrong_fragment': 'uint8',
+    'urgent': 'uint8',
+    'hot': 'uint8',
+    'num_failed_logins': 'uint8',
+    'logged_in': 'uint8',
+    'num_compromised': 'uint16',     # max 7,479
+    'root_shell': 'uint8',
+    'su_attempted': 'uint8',
+    'num_root': 'uint16',            # max 7,468
+    'num_file_creations': 'uint8',
+    'num_shells': 'uint8',
+    'num_access_files': 'uint8',
+    'num_outbound_cmds': 'uint8',
+    'is_host_login': 'uint8',
+    'is_guest_login': 'uint8',
+    'count': 'uint16',               # 2-second window, max 511
+    'srv_count': 'uint16',
+    'dst_host_count': 'uint8',       # 100-connection window, max 255
+    'dst_host_srv_count': 'uint8',
+}
+
+KDD_SCHEMA = {
+    **{c: 'category' for c in CATEGORICAL_COLUMNS},
+    **{c: 'float32' for c in RATE_COLUMNS},
+    **INTEGER_COLUMNS,
+}
+
+
+def read_csv_dtypes():
+    """dtype mapping that is safe to hand to ``pd.read_csv`` directly.
+
+    Integer columns are left out: the C parser silently wraps values that
+    overflow a narrow integer type (300 -> 44 as uint8), so they are parsed
+    wide and narrowed with a range check in :func:`apply_schema`.
+    """
+    return {c: dtype for c, dtype in KDD_SCHEMA.items() if c not in INTEGER_COLUMNS}
+
+
+def _narrow_integer(series, dtype):
+    dtype = np.dtype(dtype)
+    if series.dtype == dtype:
+        return series
+    if series.isna().any():
+        raise ValueError(f"Column {series.name!r} has missing values; "
+                         f"cannot store as {dtype}")
+    if len(series):
+        info = np.iinfo(dtype)
+        low, high = series.min(), series.max()
+        if low < info.min or high > info.max:
+            raise ValueError(f"Column {series.name!r} has values in [{low}, {high}], "
+                             f"outside the declared {dtype} range")
+    return series.astype(dtype)
+
+
+def apply_schema(df):
+    """Cast a parsed KDD frame (or chunk) to the declared compact dtypes.
+
+    Columns not in the schema are left untouched. Raises ValueError rather
+    than wrapping when an integer value does not fit its declared type.
+    """
+    for column, dtype in KDD_SCHEMA.items():
+        if column not in df.columns:
+            continue
+        if column in INTEGER_COLUMNS:
+            df[column] = _narrow_integer(df[column], dtype)
+        elif str(df[column].dtype) != dtype:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def memory_report(before, after):
+    """Per-column memory of two versions of the same frame, in bytes."""
+    before_bytes = before.memory_usage(index=False, deep=True)
+    after_bytes = after.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        'before_dtype': before.dtypes.astype(str),
+        'before_bytes': before_bytes,
+        'after_dtype': after.dtypes.astype(str),
+        'after_bytes': after_bytes,
+    })
+    report['reduction'] = 1 - report['after_bytes'] / report['before_bytes']
+    total = pd.DataFrame({
+        'before_dtype': [''], 'before_bytes': [before_bytes.sum()],
+        'after_dtype': [''], 'after_bytes': [after_bytes.sum()],
+        'reduction': [1 - after_bytes.sum() / before_bytes.sum()],
+    }, index=['TOTAL'])
+    return pd.concat([report, total])
+
+
+def dtype_memory_report(filepath, nrows=None):
+    """Parse ``filepath`` with inferred and with declared dtypes and compare."""
+    inferred = pd.read_csv(filepath, nrows=nrows)
+    declared = apply_schema(pd.read_csv(filepath, nrows=nrows, dtype=read_csv_dtypes()))
+    return memory_report(inferred, declared)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from src.data.ingestion import resolve_kdd_path
+
+    path = sys.argv[1] if len(sys.argv) > 1 else resolve_kdd_path("train")
+    report = dtype_memory_report(path)
+    print(f"📊 Memory per column: {path}")
+    print(report.to_string(formatters={
+        'before_bytes': '{:,.0f}'.format,
+        'after_bytes': '{:,.0f}'.format,
+        'reduction': '{:.1%}'.format,
+    }))
@@ -0,0 +1,297 @@
+"""
+Asyncio tailer for growing CSV/JSONL connection logs.
+
+``LogTailer`` follows a log file the way ``tail -F`` does: it reads only
+newly appended bytes, survives rotation (rename + recreate) and
+truncation, and groups new lines into micro-batches that are handed to a
+scoring callback as soon as either ``batch_size`` lines are waiting or the
+oldest waiting line is ``max_delay`` seconds old. Lines that cannot be
+parsed or typed are dropped and counted (``stats()['rejected']``) instead
+of stopping the tailer.
+"""
+import asyncio
+import collections
+import inspect
+import io
+import json
+import os
+import time
+
+import pandas as pd
+
+from src.data.schema import apply_schema
+
+READ_BLOCK_SIZE = 1 << 20
+# Bytes read per poll; a large backlog is worked through over several polls.
+MAX_READ_BYTES = 16 * READ_BLOCK_SIZE
+
+
+class LogTailer:
+    """Follow ``path`` and deliver parsed micro-batches to ``on_batch``.
+
+    ``on_batch`` receives a DataFrame (typed with the KDD schema where the
+    columns match) and may be a plain function or a coroutine function.
+    ``fmt`` is ``"csv"`` or ``"jsonl"`` and defaults to the file extension.
+    CSV files must start with a header row; it is re-read after rotation.
+    """
+
+    def __init__(self, path, on_batch, batch_size=1000, max_delay=0.5,
+                 poll_interval=0.05, fmt=None, from_start=False):
+        self.path = str(path)
+        self.on_batch = on_batch
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.fmt = fmt or ("jsonl" if self.path.endswith((".jsonl", ".json", ".ndjson")) else "csv")
+        self.from_start = from_start
+
+        self._open_at_end = not from_start  # only for the file as first found
+        self._handle = None
+        self._inode = None
+        self._partial = b""
+        self._columns = None
+        self._stopping = False
+        self._at_eof = False
+
+        self._pending = []
+        self._pending_since = None
+        self._pending_reads = collections.deque()  # [n_lines, read_time] per read
+        self._started = None
+        self.lines = 0
+        self.batches = 0
+        self.rotations = 0
+        self.rejected = 0
+        self.last_error = None
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._total_lag = 0.0
+
+    # -- file following -------------------------------------------------
+
+    def _open(self, seek_end):
+        try:
+            handle = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        if self.fmt == "csv":
+            header = handle.readline()
+            if header.endswith(b"\n"):
+                self._columns = header.decode("utf-8").strip().split(",")
+            else:
+                handle.seek(0)
+                self._columns = None
+        if seek_end:
+            handle.seek(0, os.SEEK_END)
+        self._handle = handle
+        self._inode = os.fstat(handle.fileno()).st_ino
+        self._partial = b""
+        return True
+
+    def _rotated(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return stat.st_ino != self._inode or stat.st_size < self._handle.tell()
+
+    def _read_available(self):
+        """Blocking read of complete lines appended since the last call.
+
+        Reads at most ``MAX_READ_BYTES``; the rest is picked up by the next
+        call. Rotation is only acted on once the old file is fully read.
+        """
+        if self._handle is None:
+            if not self._open(seek_end=self._open_at_end):
+                return []
+            self._open_at_end = False
+        lines = self._drain()
+        if self._at_eof and self._rotated():
+            # The old file is finished; start the new one from its beginning,
+            # now or (if it is not there yet) whenever it appears.
+            self._handle.close()
+            self._handle = None
+            self.rotations += 1
+            self._open_at_end = False
+            if self._open(seek_end=False):
+                lines += self._drain()
+        return lines
+
+    def _drain(self, max_bytes=None):
+        max_bytes = max_bytes or MAX_READ_BYTES
+        blocks = []
+        size = 0
+        self._at_eof = False
+        while size < max_bytes:
+            block = self._handle.read(min(READ_BLOCK_SIZE, max_bytes - size))
+            if not block:
+                self._at_eof = True
+                break
+            blocks.append(block)
+            size += len(block)
+        if not blocks:
+            return []
+        data = self._partial + b"".join(blocks)
+        *complete, self._partial = data.split(b"\n")
+        if self.fmt == "csv" and self._columns is None and complete:
+            self._columns = complete.pop(0).decode("utf-8").strip().split(",")
+        return [line for line in complete if line.strip()]
+
+    # -- batching -----------------------------------------------------------
+
+    def _parse_lines(self, lines):
+        if self.fmt == "jsonl":
+            frame = pd.DataFrame.from_records([json.loads(line) for line in lines])
+        else:
+            text = b"\n".join(lines).decode("utf-8")
+            frame = pd.read_csv(io.StringIO(text), header=None, names=self._columns)
+        return apply_schema(frame)
+
+    def parse(self, lines):
+        """Turn raw lines into a DataFrame, dropping lines that do not parse.
+
+        The batch is parsed in one go; only if that fails is it re-parsed
+        line by line to find and reject the offending lines.
+        """
+        try:
+            return self._parse_lines(lines)
+        except Exception:
+            pass
+        good = []
+        for line in lines:
+            try:
+                self._parse_lines([line])
+                good.append(line)
+            except Exception as e:
+                self._reject(line, e)
+        if not good:
+            return None
+        try:
+            return self._parse_lines(good)
+        except Exception as e:  # lines that only clash when combined
+            for line in good:
+                self._reject(line, e)
+            return None
+
+    def _reject(self, line, error):
+        if self.rejected == 0:
+            print(f"⚠️ Skipping unparseable log line: {line[:200]!r} ({error})")
+        self.rejected += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+
+    def _take_pending(self):
+        """Pop the next batch of lines and the read time of its oldest line."""
+        lines = self._pending[:self.batch_size]
+        del self._pending[:self.batch_size]
+        since = self._pending_reads[0][1]
+        remaining = len(lines)
+        while remaining:
+            read = self._pending_reads[0]
+            used = min(remaining, read[0])
+            read[0] -= used
+            remaining -= used
+            if not read[0]:
+                self._pending_reads.popleft()
+        self._pending_since = self._pending_reads[0][1] if self._pending_reads else None
+        return lines, since
+
+    async def _flush(self):
+        while self._pending:
+            lines, since = self._take_pending()
+
+            frame = self.parse(lines)
+            if frame is not None:
+                result = self.on_batch(frame)
+                if inspect.isawaitable(result):
+                    await result
+
+            lag = time.monotonic() - since
+            self.lines += len(lines)
+            self.batches += 1
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self._total_lag += lag
+
+    async def run(self):
+        """Tail until :meth:`stop` is called; flushes pending lines on exit."""
+        self._started = time.monotonic()
+        try:
+            while not self._stopping:
+                lines = await asyncio.to_thread(self._read_available)
+                now = time.monotonic()
+                if lines:
+                    if self._pending_since is None:
+                        self._pending_since = now
+                    self._pending.extend(lines)
+                    self._pending_reads.append([len(lines), now])
+                due = (self._pending_since is not None
+                       and now - self._pending_since >= self.max_delay)
+                if len(self._pending) >= self.batch_size or due:
+                    await self._flush()
+                if not lines:
+                    wait = self.poll_interval
+                    if self._pending_since is not None:
+                        wait = min(wait, max(0.0, self._pending_since + self.max_delay - now))
+                    await asyncio.sleep(wait)
+            await self._flush()
+        finally:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def stop(self):
+        self._stopping = True
+
+    def stats(self):
+        """Throughput and lag so far.
+
+        ``lag`` is measured from when a line was read to when the callback
+        for its batch returned; ``bytes_behind`` is how much of the file
+        has been written but not yet read.
+        """
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        bytes_behind = 0
+        if self._handle is not None:
+            try:
+                bytes_behind = max(0, os.stat(self.path).st_size - self._handle.tell())
+            except OSError:
+                pass
+        return {
+            'lines': self.lines,
+            'batches': self.batches,
+            'rotations': self.rotations,
+            'rejected': self.rejected,
+            'lines_per_sec': self.lines / elapsed if elapsed else 0.0,
+            'last_lag_ms': self.last_lag * 1000,
+            'mean_lag_ms': self._total_lag / self.batches * 1000 if self.batches else 0.0,
+            'max_lag_ms': self.max_lag * 1000,
+            'bytes_behind': bytes_behind,
+        }
+
+
+async def tail_log(path, on_batch, report_every=5.0, **kwargs):
+    """Run a ``LogTailer`` forever, printing its stats every few seconds."""
+    tailer = LogTailer(path, on_batch, **kwargs)
+    task = asyncio.create_task(tailer.run())
+    try:
+        while not task.done():
+            await asyncio.sleep(report_every)
+            stats = tailer.stats()
+            print(f"📡 {stats['lines']:,} lines | {stats['lines_per_sec']:,.0f} lines/s | "
+                  f"lag {stats['last_lag_ms']:.1f} ms (max {stats['max_lag_ms']:.1f}) | "
+                  f"{stats['bytes_behind']:,} bytes behind")
+    finally:
+        tailer.stop()
+        await task
+    return tailer
+
+
+if __name__ == "__main__":
+    import sys
+
+    def _print_batch(batch):
+        print(f"   batch of {len(batch):,} rows")
+
+    try:
+        asyncio.run(tail_log(sys.argv[1], _print_batch))
+    except KeyboardInterrupt:
+        pass
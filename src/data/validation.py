@@ -0,0 +1,240 @@
+"""
+Chunk-aware schema validation for KDD connection data.
+
+Every check is vectorized over a whole chunk and produces a
+``ValidationReport``; reports from consecutive chunks (or from parallel
+workers) merge into one. Streaming a file through ``validate_kdd_file``
+stops at the first bad chunk by default, so a broken multi-GB export is
+rejected before any time is spent training or scoring on it.
+"""
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from src.data.schema import (CATEGORICAL_COLUMNS, INTEGER_COLUMNS, KDD_COLUMNS,
+                             KNOWN_CATEGORIES, RATE_COLUMNS)
+
+# The unlabeled Test_data.csv has no target column.
+OPTIONAL_COLUMNS = ['class']
+
+NUMERIC_RANGES = {
+    **{c: (0, np.iinfo(dtype).max) for c, dtype in INTEGER_COLUMNS.items()},
+    **{c: (0.0, 1.0) for c in RATE_COLUMNS},
+}
+
+# How many distinct offending values to keep per column in a report.
+MAX_EXAMPLES = 10
+
+
+class DataValidationError(ValueError):
+    """Raised when data fails validation; carries the merged report."""
+
+    def __init__(self, report):
+        self.report = report
+        super().__init__("; ".join(report.errors()) or "Data validation failed")
+
+
+class ValidationReport:
+    """Mergeable validation statistics for one or more chunks."""
+
+    def __init__(self):
+        self.rows = 0
+        self.chunks = 0
+        self.columns = None
+        self.missing_columns = []
+        self.unexpected_columns = []
+        self.dtype_errors = {}
+        self.null_counts = Counter()
+        self.range_violations = Counter()
+        self.domain_violations = {}
+        self.minimums = {}
+        self.maximums = {}
+        self.parse_error = None
+
+    def merge(self, other):
+        """Fold ``other`` (a later chunk or another worker) into this report."""
+        self.rows += other.rows
+        self.chunks += other.chunks
+        if self.columns is None:
+            self.columns = other.columns
+        for column in other.missing_columns:
+            if column not in self.missing_columns:
+                self.missing_columns.append(column)
+        for column in other.unexpected_columns:
+            if column not in self.unexpected_columns:
+                self.unexpected_columns.append(column)
+        for column, message in other.dtype_errors.items():
+            self.dtype_errors.setdefault(column, message)
+        self.null_counts.update(other.null_counts)
+        self.range_violations.update(other.range_violations)
+        for column, counts in other.domain_violations.items():
+            self.domain_violations.setdefault(column, Counter()).update(counts)
+        for column, value in other.minimums.items():
+            self.minimums[column] = min(value, self.minimums.get(column, value))
+        for column, value in other.maximums.items():
+            self.maximums[column] = max(value, self.maximums.get(column, value))
+        self.parse_error = self.parse_error or other.parse_error
+        return self
+
+    def errors(self):
+        """Human-readable list of every problem found so far."""
+        errors = []
+        if self.parse_error:
+            errors.append(f"parse error: {self.parse_error}")
+        if self.missing_columns:
+            errors.append(f"missing columns: {self.missing_columns}")
+        if self.unexpected_columns:
+            errors.append(f"unexpected columns: {self.unexpected_columns}")
+        for column, message in self.dtype_errors.items():
+            errors.append(f"{column}: {message}")
+        for column, count in self.null_counts.items():
+            if count:
+                errors.append(f"{column}: {count:,} missing values")
+        for column, count in self.range_violations.items():
+            if count:
+                low, high = NUMERIC_RANGES[column]
+                errors.append(f"{column}: {count:,} values outside [{low}, {high}] "
+                              f"(observed [{self.minimums[column]}, {self.maximums[column]}])")
+        for column, counts in self.domain_violations.items():
+            examples = [value for value, _ in counts.most_common(MAX_EXAMPLES)]
+            errors.append(f"{column}: {sum(counts.values()):,} values outside the "
+                          f"known domain, e.g. {examples}")
+        return errors
+
+    @property
+    def valid(self):
+        return not self.errors()
+
+    def to_dict(self):
+        return {
+            'valid': self.valid,
+            'rows': self.rows,
+            'chunks': self.chunks,
+            'columns': len(self.columns or []),
+            'missing_columns': list(self.missing_columns),
+            'unexpected_columns': list(self.unexpected_columns),
+            'dtype_errors': dict(self.dtype_errors),
+            'null_counts': {c: n for c, n in self.null_counts.items() if n},
+            'range_violations': {c: n for c, n in self.range_violations.items() if n},
+            'domain_violations': {c: dict(n.most_common(MAX_EXAMPLES))
+                                  for c, n in self.domain_violations.items()},
+            'errors': self.errors(),
+        }
+
+
+def validate_chunk(chunk, domains=None, check_columns=True):
+    """Validate one DataFrame chunk and return its ``ValidationReport``.
+
+    ``domains`` maps categorical columns to their allowed values and
+    defaults to the KDD vocabularies in ``src.data.schema``. Columns with
+    no listed domain (``service``) are open and only null-checked.
+    """
+    if domains is None:
+        domains = KNOWN_CATEGORIES
+    report = ValidationReport()
+    report.rows = len(chunk)
+    report.chunks = 1
+    report.columns = list(chunk.columns)
+
+    if check_columns:
+        present = set(chunk.columns)
+        report.missing_columns = [c for c in KDD_COLUMNS
+                                  if c not in present and c not in OPTIONAL_COLUMNS]
+        report.unexpected_columns = [c for c in chunk.columns if c not in KDD_COLUMNS]
+
+    nulls = chunk.isna().sum()
+    report.null_counts.update({c: int(n) for c, n in nulls.items() if n})
+
+    numeric = [c for c in NUMERIC_RANGES if c in chunk.columns]
+    for column in list(numeric):
+        if not pd.api.types.is_numeric_dtype(chunk[column].dtype):
+            report.dtype_errors[column] = f"expected numeric, found {chunk[column].dtype}"
+            numeric.remove(column)
+    if numeric and len(chunk):
+        values = chunk[numeric].to_numpy(dtype=np.float64)
+        low = np.array([NUMERIC_RANGES[c][0] for c in numeric])
+        high = np.array([NUMERIC_RANGES[c][1] for c in numeric])
+        outside = ((values < low) | (values > high)).sum(axis=0)
+        minimums = np.nanmin(values, axis=0, initial=np.inf, where=~np.isnan(values))
+        maximums = np.nanmax(values, axis=0, initial=-np.inf, where=~np.isnan(values))
+        for i, column in enumerate(numeric):
+            if outside[i]:
+                report.range_violations[column] = int(outside[i])
+            if np.isfinite(minimums[i]):
+                report.minimums[column] = minimums[i].item()
+                report.maximums[column] = maximums[i].item()
+        # Integer columns must hold whole numbers.
+        integer = [i for i, c in enumerate(numeric) if c in INTEGER_COLUMNS]
+        if integer:
+            block = values[:, integer]
+            fractional = (np.mod(block, 1) != 0) & ~np.isnan(block)
+            for i in np.flatnonzero(fractional.any(axis=0)):
+                report.dtype_errors[numeric[integer[i]]] = "expected integers, found fractions"
+
+    for column in CATEGORICAL_COLUMNS:
+        if column not in chunk.columns:
+            continue
+        series = chunk[column]
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            report.dtype_errors[column] = f"expected strings, found {series.dtype}"
+            continue
+        if column in domains:
+            unknown = series[~series.isin(domains[column]) & series.notna()]
+            if len(unknown):
+                counts = unknown.astype(str).value_counts()
+                report.domain_violations[column] = Counter(counts.to_dict())
+    return report
+
+
+def validate_chunks(chunks, domains=None, fail_fast=True):
+    """Validate a stream of chunks and merge their reports.
+
+    With ``fail_fast`` the stream is abandoned at the first chunk that has
+    errors, so no further data is read or parsed.
+    """
+    report = ValidationReport()
+    chunks = iter(chunks)
+    while True:
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            break
+        except (ValueError, pd.errors.ParserError) as e:
+            report.parse_error = str(e)
+            break
+        report.merge(validate_chunk(chunk, domains=domains,
+                                    check_columns=report.chunks == 0))
+        if fail_fast and not report.valid:
+            break
+    return report
+
+
+def validate_kdd_file(filepath, chunksize=None, domains=None, fail_fast=True,
+                      raise_on_error=False):
+    """Stream-validate a KDD CSV and return the merged report.
+
+    The file is parsed without the compact dtype schema so that bad values
+    are reported rather than rejected by the parser.
+    """
+    from src.data.ingestion import DEFAULT_CHUNK_SIZE, iter_kdd_chunks
+
+    chunks = iter_kdd_chunks(filepath=filepath, chunksize=chunksize or DEFAULT_CHUNK_SIZE,
+                             apply_schema=False)
+    report = validate_chunks(chunks, domains=domains, fail_fast=fail_fast)
+    if raise_on_error and not report.valid:
+        raise DataValidationError(report)
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    from src.data.ingestion import resolve_kdd_path
+
+    path = sys.argv[1] if len(sys.argv) > 1 else resolve_kdd_path("train")
+    result = validate_kdd_file(path, fail_fast=False)
+    print(f"{'✅' if result.valid else '❌'} {path}: {result.rows:,} rows "
+          f"in {result.chunks} chunks")
+    for error in result.errors():
+        print(f"   • {error}")
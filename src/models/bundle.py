@@ -0,0 +1,242 @@
+"""
+Single-file, versioned model bundle with memory-mapped arrays.
+
+The notebook leaves four joblib pickles (plus two stray copies) that all
+have to be unpickled eagerly before the first prediction. A bundle is one
+file: a fixed header, a JSON manifest (format and model version, feature
+list, encoder vocabularies, scaler parameters, label classes, array
+table) and the compiled forest's arrays, each 64-byte aligned. Loading
+parses only the manifest and memory-maps the arrays, so a scoring
+process starts in milliseconds and forked or spawned workers share the
+same page-cache pages.
+"""
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from src.models.compiled_forest import ARRAY_NAMES, MODEL_FILENAME, CompiledForest
+from src.models.encoders import ARTIFACT_DIR, CategoricalEncoder
+from src.models.preprocessing import SCALER_FILENAME, FeaturePreprocessor
+
+BUNDLE_FILENAME = "security_model.bundle"
+BUNDLE_FORMAT_VERSION = 1
+MAGIC = b"NSABNDL\x00"
+HEADER = struct.Struct("<8sQ")  # magic, manifest length
+ALIGNMENT = 64
+TARGET_ENCODER_FILENAME = "target_encoder.pkl"
+# Older notebook runs also wrote these duplicates.
+LEGACY_MODEL_FILENAME = "security_model.pkl"
+LEGACY_ENCODERS_FILENAME = "encoders.pkl"
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class ModelBundle:
+    """Preprocessing + compiled forest + label classes, loadable in one step."""
+
+    def __init__(self, preprocessor, forest, target_classes, model_version=None, metadata=None):
+        self.preprocessor = preprocessor
+        self.forest = forest
+        self.target_classes = np.asarray(target_classes, dtype=object)
+        self.model_version = model_version or time.strftime("%Y%m%d%H%M%S")
+        self.metadata = dict(metadata or {})
+
+    @classmethod
+    def from_models(cls, model, preprocessor, target_classes, **kwargs):
+        """Bundle a fitted ``RandomForestClassifier`` and its preprocessing."""
+        return cls(preprocessor, CompiledForest.from_sklearn(model), target_classes, **kwargs)
+
+    @classmethod
+    def from_artifacts(cls, directory=ARTIFACT_DIR, **kwargs):
+        """Convert the notebook's pickles in ``directory`` into a bundle."""
+        import joblib
+
+        def first(*names):
+            for name in names:
+                path = os.path.join(directory, name)
+                if os.path.exists(path):
+                    return joblib.load(path)
+            raise FileNotFoundError(f"None of {names} found in {directory}")
+
+        model = first(MODEL_FILENAME, LEGACY_MODEL_FILENAME)
+        scaler = first(SCALER_FILENAME)
+        try:
+            encoder = CategoricalEncoder.load(directory)
+        except FileNotFoundError:
+            encoder = CategoricalEncoder.from_label_encoders(first(LEGACY_ENCODERS_FILENAME))
+        target_classes = first(TARGET_ENCODER_FILENAME).classes_
+        preprocessor = FeaturePreprocessor.from_artifacts(encoder, scaler)
+        return cls.from_models(model, preprocessor, target_classes, **kwargs)
+
+    @property
+    def features(self):
+        return self.preprocessor.features
+
+    def manifest(self):
+        encoder = self.preprocessor.encoder
+        return {
+            'format_version': BUNDLE_FORMAT_VERSION,
+            'model_version': self.model_version,
+            'features': self.preprocessor.features,
+            'encoder': {
+                'vocabularies': {c: list(v) for c, v in encoder.vocabularies.items()},
+                'hash_widths': encoder.hash_widths,
+                'unknown_code': encoder.unknown_code,
+            },
+            'scaler': {
+                'columns': self.preprocessor.numerical,
+                'mean': self.preprocessor.mean.tolist(),
+                'scale': self.preprocessor.scale.tolist(),
+            },
+            'target_classes': [str(c) for c in self.target_classes],
+            'forest': {
+                'classes': self.forest.classes.tolist(),
+                'max_depth': self.forest.max_depth,
+                'feature_names': self.forest.feature_names,
+                'n_trees': self.forest.n_trees,
+                'n_nodes': self.forest.n_nodes,
+            },
+            'metadata': self.metadata,
+        }
+
+    def save(self, path=os.path.join(ARTIFACT_DIR, BUNDLE_FILENAME)):
+        """Write the bundle atomically (temp file + rename)."""
+        manifest = self.manifest()
+        arrays = {name: np.ascontiguousarray(getattr(self.forest, name)) for name in ARRAY_NAMES}
+        # The array table holds offsets relative to the data section, so the
+        # manifest length does not depend on itself.
+        table = {}
+        offset = 0
+        for name, array in arrays.items():
+            offset = _aligned(offset)
+            table[name] = {'offset': offset, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+            offset += array.nbytes
+        manifest['arrays'] = table
+        encoded = json.dumps(manifest).encode("utf-8")
+        data_start = _aligned(HEADER.size + len(encoded))
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(HEADER.pack(MAGIC, len(encoded)))
+            handle.write(encoded)
+            for name, array in arrays.items():
+                handle.seek(data_start + table[name]['offset'])
+                handle.write(array.tobytes())
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=os.path.join(ARTIFACT_DIR, BUNDLE_FILENAME), mmap=True):
+        """Read the manifest and map (or, with ``mmap=False``, read) the arrays."""
+        manifest = read_manifest(path)
+        data_start = _aligned(HEADER.size + manifest['_manifest_bytes'])
+        arrays = {}
+        for name, entry in manifest['arrays'].items():
+            dtype, shape = np.dtype(entry['dtype']), tuple(entry['shape'])
+            offset = data_start + entry['offset']
+            if not int(np.prod(shape)):
+                arrays[name] = np.empty(shape, dtype=dtype)
+            elif mmap:
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=offset,
+                                         shape=shape).view(np.ndarray)
+            else:
+                arrays[name] = np.fromfile(path, dtype=dtype, count=int(np.prod(shape)),
+                                           offset=offset).reshape(shape)
+
+        forest_meta = manifest['forest']
+        forest = CompiledForest(*(arrays[name] for name in ARRAY_NAMES), forest_meta['classes'],
+                                forest_meta['max_depth'], forest_meta['feature_names'])
+        encoder_meta = manifest['encoder']
+        encoder = CategoricalEncoder(encoder_meta['vocabularies'], encoder_meta['unknown_code'],
+                                     encoder_meta['hash_widths'])
+        scaler = manifest['scaler']
+        preprocessor = FeaturePreprocessor(encoder, scaler['mean'], scaler['scale'],
+                                           manifest['features'], scaler['columns'])
+        return cls(preprocessor, forest, manifest['target_classes'],
+                   manifest['model_version'], manifest['metadata'])
+
+    def transform(self, df, out=None):
+        return self.preprocessor.transform(df, out=out)
+
+    def predict_proba(self, df):
+        """Class probabilities (columns in ``target_classes`` order)."""
+        return self.forest.predict_proba(self.transform(df))
+
+    def predict(self, df):
+        """Predicted labels, e.g. ``'normal'`` / ``'anomaly'``."""
+        predictions = self.forest.predict(self.transform(df))
+        if predictions.dtype.kind in "iu":  # trained on target_encoder codes
+            return self.target_classes[predictions]
+        return predictions
+
+
+def read_manifest(path):
+    """Parse just the header and manifest of a bundle file."""
+    with open(path, "rb") as handle:
+        magic, length = HEADER.unpack(handle.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a model bundle")
+        manifest = json.loads(handle.read(length))
+    if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format {manifest.get('format_version')} in {path}")
+    manifest['_manifest_bytes'] = length
+    return manifest
+
+
+def load_bundle(path=os.path.join(ARTIFACT_DIR, BUNDLE_FILENAME)):
+    return ModelBundle.load(path)
+
+
+def _cold_start_pickles(directory, frame):
+    import joblib
+
+    model = joblib.load(os.path.join(directory, MODEL_FILENAME))
+    scaler = joblib.load(os.path.join(directory, SCALER_FILENAME))
+    label_encoders = joblib.load(os.path.join(directory, "label_encoders.pkl"))
+    joblib.load(os.path.join(directory, TARGET_ENCODER_FILENAME))
+    preprocessor = FeaturePreprocessor.from_artifacts(label_encoders, scaler)
+    return len(model.predict(preprocessor.transform(frame)))
+
+
+def _cold_start_bundle(path, frame):
+    return len(load_bundle(path).predict(frame))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.utils.benchmark import print_benchmark_table, run_isolated
+
+    parser = argparse.ArgumentParser(description="Convert notebook pickles into a model bundle")
+    parser.add_argument("--artifacts", default=ARTIFACT_DIR)
+    parser.add_argument("--output", default=None, help=f"default: <artifacts>/{BUNDLE_FILENAME}")
+    parser.add_argument("--version", default=None)
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare cold start (load + first prediction) in fresh processes")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(args.artifacts, BUNDLE_FILENAME)
+    bundle = ModelBundle.from_artifacts(args.artifacts, model_version=args.version)
+    bundle.save(output)
+    print(f"📦 Wrote {output} ({os.path.getsize(output) / 1024:.0f} KB, "
+          f"model version {bundle.model_version})")
+
+    if args.benchmark:
+        from src.data.schema import apply_schema
+        from src.utils.benchmark import synthetic_kdd_frame
+
+        frame = apply_schema(synthetic_kdd_frame(1))[bundle.features]
+        assert (load_bundle(output).predict(frame) == bundle.predict(frame)).all()
+        rows = []
+        for label, fn, target in [("4 joblib pickles", _cold_start_pickles, args.artifacts),
+                                  ("mmap bundle", _cold_start_bundle, output)]:
+            stats = run_isolated(fn, target, frame)
+            rows.append({'artifact': label, 'cold_start_ms': stats['seconds'] * 1000,
+                         'peak_rss_mb': stats['peak_rss_mb']})
+        print_benchmark_table("Cold start: load + first prediction", rows)
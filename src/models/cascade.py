@@ -0,0 +1,196 @@
+"""
+Two-stage cascade: logistic regression first, random forest for the rest.
+
+The notebook trains both models and keeps one. ``CascadeClassifier``
+keeps both: the linear model scores every record, and only records whose
+predicted attack probability falls inside the uncertain band
+``[low, high]`` are passed to the forest. ``tune_band`` picks the widest
+skip region (the narrowest band) whose validation accuracy stays within
+``tolerance`` of the forest's own.
+"""
+import os
+import time
+
+import joblib
+import numpy as np
+
+from src.models.encoders import ARTIFACT_DIR
+
+CASCADE_FILENAME = "cascade_model.pkl"
+DEFAULT_TOLERANCE = 0.0
+MAX_THRESHOLDS = 1_000
+
+
+class CascadeClassifier:
+    """Linear model decides confident records; the forest decides the band."""
+
+    def __init__(self, linear, forest, low=0.0, high=1.0):
+        self.linear = linear
+        self.forest = forest
+        self.low = float(low)
+        self.high = float(high)
+        self.classes_ = np.asarray(linear.classes_)
+        self.n_scored = 0
+        self.n_forest = 0
+
+    def linear_proba(self, X):
+        """Probability of ``classes_[1]`` from the linear model."""
+        return self.linear.predict_proba(X)[:, 1]
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        proba = self.linear_proba(X)
+        predictions = np.where(proba > self.high, self.classes_[1], self.classes_[0])
+        uncertain = (proba >= self.low) & (proba <= self.high)
+        if uncertain.any():
+            predictions[uncertain] = self.forest.predict(X[uncertain])
+        self.n_scored += len(X)
+        self.n_forest += int(uncertain.sum())
+        return predictions
+
+    @property
+    def skip_fraction(self):
+        """Share of records scored so far that never reached the forest."""
+        return 1.0 - self.n_forest / self.n_scored if self.n_scored else 0.0
+
+    def save(self, directory=ARTIFACT_DIR, filename=CASCADE_FILENAME):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, filename)
+        joblib.dump(self, path)
+        return path
+
+
+def tune_band(proba, linear_pred, forest_pred, y, tolerance=DEFAULT_TOLERANCE,
+              sample_weight=None, max_thresholds=MAX_THRESHOLDS):
+    """Choose ``(low, high)`` maximizing the records that skip the forest.
+
+    ``proba`` is the linear model's probability of the positive class;
+    the band must keep cascade accuracy >= forest accuracy - ``tolerance``.
+    Every candidate pair is scored in O(1) from cumulative error counts
+    over the records sorted by ``proba``.
+    """
+    weights = np.ones(len(y)) if sample_weight is None else np.asarray(sample_weight, float)
+    order = np.argsort(proba, kind="stable")
+    p = proba[order]
+    w = weights[order]
+    linear_err = np.concatenate([[0.0], np.cumsum(w * (linear_pred[order] != y[order]))])
+    forest_err = np.concatenate([[0.0], np.cumsum(w * (forest_pred[order] != y[order]))])
+    mass = np.concatenate([[0.0], np.cumsum(w)])
+    total = mass[-1]
+    target_errors = forest_err[-1] + tolerance * total
+
+    # Candidate cut positions: the band covers sorted records [i, j). Cuts
+    # only fall where the probability changes, since a threshold cannot
+    # separate tied records.
+    cuts = np.append(np.unique(p, return_index=True)[1], len(p))
+    if len(cuts) > max_thresholds:
+        cuts = cuts[np.unique(np.linspace(0, len(cuts) - 1, max_thresholds).astype(int))]
+    lows = cuts[p[np.minimum(cuts, len(p) - 1)] <= 0.5] if len(p) else cuts
+    highs = cuts[(cuts == len(p)) | (p[np.minimum(cuts, len(p) - 1)] > 0.5)]
+    i = lows[:, np.newaxis]
+    j = highs[np.newaxis, :]
+    valid = i <= j
+    errors = linear_err[i] + (forest_err[j] - forest_err[i]) + (linear_err[-1] - linear_err[j])
+    skipped = np.where(valid & (errors <= target_errors + 1e-9), total - (mass[j] - mass[i]), -1)
+    best_i, best_j = np.unravel_index(np.argmax(skipped), skipped.shape)
+    i, j = int(lows[best_i]), int(highs[best_j])
+
+    # Thresholds halfway between neighbouring (distinct) probabilities,
+    # unless the midpoint rounds onto the outer one.
+    low = 0.0 if i == 0 else float((p[i - 1] + p[i]) / 2)
+    if i and low <= p[i - 1]:
+        low = float(p[i])
+    high = 1.0 if j == len(p) else float((p[j - 1] + p[j]) / 2)
+    if j < len(p) and high >= p[j]:
+        high = float(p[j - 1])
+    if i == j:  # empty band: nothing goes to the forest
+        low, high = 0.5, np.nextafter(0.5, 0.0)
+    errors = linear_err[i] + forest_err[j] - forest_err[i] + linear_err[-1] - linear_err[j]
+    return low, high, {
+        'skip_fraction': float((total - (mass[j] - mass[i])) / total),
+        'cascade_accuracy': float(1 - errors / total),
+        'forest_accuracy': float(1 - forest_err[-1] / total),
+        'linear_accuracy': float(1 - linear_err[-1] / total),
+    }
+
+
+def fit_cascade(linear, forest, X_valid, y_valid, tolerance=DEFAULT_TOLERANCE,
+                sample_weight=None):
+    """Tune the band of two already fitted models on a validation split."""
+    X_valid = np.asarray(X_valid, dtype=np.float32)
+    y_valid = np.asarray(y_valid)
+    cascade = CascadeClassifier(linear, forest)
+    proba = cascade.linear_proba(X_valid)
+    linear_pred = cascade.classes_[(proba > 0.5).astype(int)]
+    low, high, report = tune_band(proba, linear_pred, forest.predict(X_valid), y_valid,
+                                  tolerance, sample_weight)
+    cascade.low, cascade.high = low, high
+    print(f"🎚️ Band [{low:.4f}, {high:.4f}]: {report['skip_fraction'] * 100:.1f}% skip the "
+          f"forest, accuracy {report['cascade_accuracy']:.4f} "
+          f"(forest {report['forest_accuracy']:.4f})")
+    return cascade, report
+
+
+def _best_time(fn, X, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    import argparse
+    import warnings
+
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import train_test_split
+
+    from src.data.ingestion import load_kdd_data
+    from src.models.preprocessing import FeaturePreprocessor
+    from src.utils.benchmark import print_benchmark_table
+
+    parser = argparse.ArgumentParser(description="LR -> RF cascade on Test_data.csv")
+    parser.add_argument("--train-csv", default=None, help="labelled CSV (default: Train_data.csv)")
+    parser.add_argument("--test-csv", default=None, help="CSV to score (default: Test_data.csv)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--save", action="store_true", help=f"write {CASCADE_FILENAME}")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+    data = load_kdd_data("train", filepath=args.train_csv)
+    y = (data['class'].astype(str) == 'normal').to_numpy().astype(int)  # target_encoder order
+    train, rest, y_train, y_rest = train_test_split(data, y, test_size=0.4,
+                                                    random_state=42, stratify=y)
+    valid, holdout, y_valid, y_holdout = train_test_split(rest, y_rest, test_size=0.5,
+                                                          random_state=42, stratify=y_rest)
+    prep = FeaturePreprocessor().fit(train)
+    X_train = prep.transform(train)
+    forest = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42,
+                                    n_jobs=-1).fit(X_train, y_train)
+    linear = LogisticRegression(random_state=42, max_iter=1000).fit(X_train, y_train)
+    cascade, report = fit_cascade(linear, forest, prep.transform(valid), y_valid,
+                                  args.tolerance)
+
+    X_holdout = prep.transform(holdout)
+    print(f"🧪 Holdout accuracy: forest {np.mean(forest.predict(X_holdout) == y_holdout):.4f}, "
+          f"cascade {np.mean(cascade.predict(X_holdout) == y_holdout):.4f}")
+
+    test = load_kdd_data("test", filepath=args.test_csv)
+    X_test = prep.transform(test)
+    cascade.n_scored = cascade.n_forest = 0
+    agreement = float(np.mean(cascade.predict(X_test) == forest.predict(X_test)))
+    skip = cascade.skip_fraction
+    forest_s = _best_time(forest.predict, X_test)
+    cascade_s = _best_time(cascade.predict, X_test)
+    print_benchmark_table(f"Scoring {len(X_test):,} Test_data.csv records", [
+        {'model': 'forest only', 'seconds': forest_s, 'rows_per_sec': len(X_test) / forest_s,
+         'skip_fraction': 0.0, 'agreement': 1.0},
+        {'model': 'cascade', 'seconds': cascade_s, 'rows_per_sec': len(X_test) / cascade_s,
+         'skip_fraction': skip, 'agreement': agreement},
+    ])
+    print(f"\n🚀 Throughput gain: {forest_s / cascade_s:.2f}x")
+    if args.save:
+        print(f"📁 Saved to {cascade.save()}")
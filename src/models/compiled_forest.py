@@ -0,0 +1,232 @@
+"""
+Array-backed inference for trained random forests.
+
+``RandomForestClassifier.predict`` validates its input, spins up joblib
+workers and walks each tree separately, which costs milliseconds per call
+no matter how few rows are scored. ``CompiledForest`` flattens every tree
+of a fitted forest into shared contiguous arrays (feature, threshold,
+left, right, leaf probabilities) and walks all trees for a whole batch at
+once with NumPy gathers, one tree level per step. Nodes are renumbered so
+that siblings are adjacent (right child = left child + 1) and leaves
+point to themselves, so each step is a handful of flat ``take`` calls.
+
+Splits compare the float32-cast input against the float64 threshold and
+leaf probabilities are normalized and summed tree by tree, exactly as
+sklearn does, so predictions are identical.
+"""
+import json
+import os
+
+import numpy as np
+
+from src.models.encoders import ARTIFACT_DIR
+
+MODEL_FILENAME = "rf_security_model.pkl"
+ARRAY_NAMES = ('feature', 'threshold', 'left', 'right', 'missing_left', 'values', 'roots')
+META_NAME = "forest.json"
+# Rows x trees node indices held at once while walking a large batch.
+BLOCK_ELEMENTS = 1 << 21
+
+
+class CompiledForest:
+    """Flattened forest: node arrays for all trees plus per-tree roots."""
+
+    def __init__(self, feature, threshold, left, right, missing_left, values, roots,
+                 classes, max_depth, feature_names=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.values = values
+        self.roots = roots
+        self.classes = np.asarray(classes)
+        self.max_depth = int(max_depth)
+        self.feature_names = None if feature_names is None else list(feature_names)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten a fitted ``RandomForestClassifier`` (single output)."""
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Only single-output forests can be compiled")
+        parts = {name: [] for name in ARRAY_NAMES if name != 'roots'}
+        roots = []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            order, left = _sibling_order(tree.children_left, tree.children_right)
+            is_leaf = tree.children_left[order] == -1
+            nodes = np.arange(offset, offset + len(order))
+            # Leaves loop to themselves so every row can take max_depth steps.
+            left = np.where(is_leaf, nodes, left + offset)
+            parts['left'].append(left)
+            parts['right'].append(np.where(is_leaf, nodes, left + 1))
+            parts['feature'].append(np.where(is_leaf, 0, tree.feature[order]).astype(np.intp))
+            parts['threshold'].append(np.where(is_leaf, np.inf, tree.threshold[order]))
+            missing = np.asarray(getattr(tree, 'missing_go_to_left',
+                                         np.zeros(tree.node_count, dtype=np.uint8)), dtype=bool)
+            parts['missing_left'].append(missing[order] | is_leaf)
+            # Same normalization as DecisionTreeClassifier.predict_proba.
+            proba = tree.value[order, 0, :estimator.n_classes_].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            parts['values'].append(proba / normalizer)
+            roots.append(offset)
+            offset += len(order)
+            max_depth = max(max_depth, tree.max_depth)
+        arrays = {name: np.ascontiguousarray(np.concatenate(values))
+                  for name, values in parts.items()}
+        return cls(arrays['feature'], arrays['threshold'], arrays['left'], arrays['right'],
+                   arrays['missing_left'], arrays['values'], np.asarray(roots, dtype=np.intp),
+                   model.classes_, max_depth, getattr(model, 'feature_names_in_', None))
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ARRAY_NAMES)
+
+    def _as_matrix(self, X):
+        if hasattr(X, 'columns') and self.feature_names is not None:
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=np.float32)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def _leaves(self, X):
+        """Leaf node index per (row, tree) for a block of rows."""
+        X = np.ascontiguousarray(X)
+        flat = X.ravel()
+        row_base = (np.arange(len(X)) * X.shape[1])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        has_missing = bool(np.isnan(flat).any())
+        for _ in range(self.max_depth):
+            x = np.take(flat, row_base + np.take(self.feature, nodes))
+            go_right = ~(x <= np.take(self.threshold, nodes))
+            if has_missing:
+                go_right &= ~(np.isnan(x) & np.take(self.missing_left, nodes))
+            # Siblings are adjacent: right child == left child + 1.
+            nodes = np.take(self.left, nodes) + go_right
+        return nodes
+
+    def predict_proba(self, X):
+        X = self._as_matrix(X)
+        proba = np.zeros((len(X), len(self.classes)))
+        block = max(1, BLOCK_ELEMENTS // max(self.n_trees, 1))
+        for start in range(0, len(X), block):
+            leaves = self._leaves(X[start:start + block])
+            out = proba[start:start + block]
+            for t in range(self.n_trees):  # tree order, like sklearn's sum
+                out += self.values[leaves[:, t]]
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, directory):
+        """Write one ``.npy`` per array plus ``forest.json``."""
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        meta = {'classes': self.classes.tolist(), 'max_depth': self.max_depth,
+                'feature_names': self.feature_names}
+        with open(os.path.join(directory, META_NAME), "w") as handle:
+            json.dump(meta, handle, indent=1)
+        return directory
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        """Open a saved forest; arrays are memory-mapped by default."""
+        with open(os.path.join(directory, META_NAME)) as handle:
+            meta = json.load(handle)
+        arrays = [np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+                  for name in ARRAY_NAMES]
+        return cls(*arrays, meta['classes'], meta['max_depth'], meta['feature_names'])
+
+
+def _sibling_order(children_left, children_right):
+    """Breadth-first node order in which each node's two children are adjacent.
+
+    Returns the old node id for every new position and the new id of each
+    node's left child (-1 for leaves).
+    """
+    order = [0]
+    left = []
+    for old in order:
+        if children_left[old] == -1:
+            left.append(-1)
+        else:
+            left.append(len(order))
+            order.extend((children_left[old], children_right[old]))
+    return np.asarray(order, dtype=np.intp), np.asarray(left, dtype=np.intp)
+
+
+def compile_model_file(path=os.path.join(ARTIFACT_DIR, MODEL_FILENAME)):
+    """Load ``rf_security_model.pkl`` and compile it."""
+    import joblib
+
+    return CompiledForest.from_sklearn(joblib.load(path))
+
+
+def _time_call(fn, X, min_seconds=0.2, max_repeats=1000):
+    import time
+
+    timings = []
+    deadline = time.perf_counter() + min_seconds
+    while len(timings) < 3 or (time.perf_counter() < deadline and len(timings) < max_repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+if __name__ == "__main__":
+    import argparse
+    import warnings
+
+    from sklearn.ensemble import RandomForestClassifier
+
+    from src.data.schema import apply_schema
+    from src.models.preprocessing import FeaturePreprocessor
+    from src.utils.benchmark import print_benchmark_table, synthetic_kdd_frame
+
+    parser = argparse.ArgumentParser(description="sklearn vs compiled forest inference")
+    parser.add_argument("--model", default=os.path.join(ARTIFACT_DIR, MODEL_FILENAME))
+    parser.add_argument("--batch-sizes", type=int, nargs="+",
+                        default=[1, 10, 100, 1_000, 10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    frame = apply_schema(synthetic_kdd_frame(max(args.batch_sizes)))
+    prep = FeaturePreprocessor().fit(frame.iloc[:100_000])
+    X = prep.transform(frame)
+    if os.path.exists(args.model):
+        import joblib
+        model = joblib.load(args.model)
+    else:
+        print(f"⚠️ {args.model} not found; training the notebook's forest on synthetic data")
+        y = (frame['class'] != 'normal').to_numpy().astype(int)
+        model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42,
+                                       n_jobs=-1).fit(X[:100_000], y[:100_000])
+    compiled = CompiledForest.from_sklearn(model)
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+    assert np.array_equal(compiled.predict(X), model.predict(X))
+    print(f"✅ Predictions identical on {len(X):,} rows "
+          f"({compiled.n_trees} trees, {compiled.n_nodes:,} nodes, "
+          f"{compiled.nbytes / 2**20:.1f} MB)")
+
+    rows = []
+    for batch_size in args.batch_sizes:
+        batch = X[:batch_size]
+        sk = _time_call(model.predict, batch)
+        fast = _time_call(compiled.predict, batch)
+        rows.append({'batch': batch_size, 'sklearn_ms': sk * 1000, 'compiled_ms': fast * 1000,
+                     'speedup': sk / fast, 'compiled_rows_per_sec': batch_size / fast})
+    print_benchmark_table("Forest inference latency by batch size", rows)
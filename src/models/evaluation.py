@@ -0,0 +1,272 @@
+"""
+Stratified k-fold cross-validation with bootstrap confidence intervals.
+
+The notebook's 99.1% accuracy comes from one 80/20 split. Here every
+fold of a stratified k-fold is trained on a process pool: the dataset is
+a memory-mapped ``FeatureStore`` (workers receive its path and map the
+same pages) and each worker writes its out-of-fold predictions straight
+into a shared ``.npy`` memory map, so neither the matrix nor the
+predictions are ever pickled. Fold assignment is a pure function of the
+labels and the seed, so every worker derives the same folds on its own.
+
+Accuracy, precision, recall and F1 depend only on the confusion matrix,
+so resampling rows with replacement is the same as drawing confusion
+counts from a multinomial over its cells. The bootstrap therefore costs
+O(n_bootstrap) instead of O(n_bootstrap * n_rows), which is what makes
+intervals over millions of out-of-fold predictions take milliseconds.
+"""
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from src.data.feature_store import open_feature_store
+
+RF_PARAMS = {'n_estimators': 100, 'max_depth': 10, 'random_state': 42, 'n_jobs': 1}
+METRICS = ('accuracy', 'precision', 'recall', 'f1')
+POSITIVE_CLASS = 'anomaly'
+DEFAULT_SPLITS = 5
+DEFAULT_BOOTSTRAP = 2_000
+DEFAULT_CONFIDENCE = 0.95
+PREDICT_BLOCK_ROWS = 250_000
+
+
+def assign_folds(y, n_splits=DEFAULT_SPLITS, seed=42):
+    """Stratified fold id (0..n_splits-1) for every row.
+
+    Rows of each class are shuffled and dealt round-robin, so every fold
+    gets the class proportions of the whole set (within one row).
+    """
+    y = np.asarray(y)
+    rng = np.random.default_rng(seed)
+    folds = np.empty(len(y), dtype=np.int8)
+    for label in np.unique(y):
+        rows = np.flatnonzero(y == label)
+        folds[rng.permutation(rows)] = np.arange(len(rows)) % n_splits
+    return folds
+
+
+def positive_index(classes, positive=POSITIVE_CLASS):
+    """Encoded label of the attack class (``target_encoder`` order)."""
+    if classes is not None and positive in list(classes):
+        return list(classes).index(positive)
+    return 1
+
+
+def confusion_counts(y_true, y_pred, n_classes, weights=None):
+    """``(n_classes, n_classes)`` matrix, rows = truth, columns = prediction."""
+    cells = np.asarray(y_true, dtype=np.int64) * n_classes + np.asarray(y_pred, dtype=np.int64)
+    counts = np.bincount(cells, weights=weights, minlength=n_classes * n_classes)
+    return counts.reshape(n_classes, n_classes).astype(np.float64)
+
+
+def metrics_from_confusion(confusion, positive=1):
+    """Accuracy / precision / recall / F1 from one or a stack of matrices."""
+    confusion = np.asarray(confusion, dtype=np.float64)
+    total = confusion.sum(axis=(-2, -1))
+    tp = confusion[..., positive, positive]
+    predicted = confusion[..., :, positive].sum(axis=-1)
+    actual = confusion[..., positive, :].sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(actual > 0, tp / actual, 0.0)
+        f1 = np.where(predicted + actual > 0, 2 * tp / (predicted + actual), 0.0)
+    return {
+        'accuracy': np.trace(confusion, axis1=-2, axis2=-1) / total,
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+    }
+
+
+def bootstrap_intervals(confusion, n_bootstrap=DEFAULT_BOOTSTRAP, confidence=DEFAULT_CONFIDENCE,
+                        positive=1, seed=42):
+    """Percentile bootstrap ``{metric: (low, high)}`` for a confusion matrix.
+
+    Weighted (deduplicated) counts are resampled as the expanded rows
+    they stand for.
+    """
+    confusion = np.asarray(confusion, dtype=np.float64)
+    n_rows = int(round(confusion.sum()))
+    draws = np.random.default_rng(seed).multinomial(n_rows, confusion.ravel() / confusion.sum(),
+                                                    size=n_bootstrap)
+    samples = metrics_from_confusion(draws.reshape((n_bootstrap,) + confusion.shape), positive)
+    tail = (1 - confidence) / 2 * 100
+    return {name: tuple(np.percentile(values, [tail, 100 - tail]))
+            for name, values in samples.items()}
+
+
+def fit_fold(store, fold, n_splits, seed, rf_params, predictions_path):
+    """Train on every other fold and write this fold's predictions.
+
+    Runs inside pool workers: ``store`` arrives as a path and is mapped,
+    and predictions go into the shared ``predictions_path`` memory map.
+    """
+    y = np.asarray(store.y)
+    held_out = assign_folds(y, n_splits, seed) == fold
+    weights = store.weights
+    start = time.perf_counter()
+    model = RandomForestClassifier(**rf_params)
+    model.fit(store.X[~held_out], y[~held_out],
+              sample_weight=None if weights is None else weights[~held_out])
+    fit_seconds = time.perf_counter() - start
+
+    predictions = np.load(predictions_path, mmap_mode="r+")
+    rows = np.flatnonzero(held_out)
+    for begin in range(0, len(rows), PREDICT_BLOCK_ROWS):
+        block = rows[begin:begin + PREDICT_BLOCK_ROWS]
+        predictions[block] = model.predict(store.X[block])
+    predictions.flush()
+    return {'fold': fold, 'n_train': int(len(y) - len(rows)), 'n_test': int(len(rows)),
+            'fit_seconds': fit_seconds, 'score_seconds': time.perf_counter() - start - fit_seconds}
+
+
+def cross_validate(store, n_splits=DEFAULT_SPLITS, rf_params=None, n_bootstrap=DEFAULT_BOOTSTRAP,
+                   confidence=DEFAULT_CONFIDENCE, max_workers=None, seed=42, workdir=None):
+    """Run stratified k-fold on a pool and return ``(summary, folds)``.
+
+    ``summary`` has one row per metric: the pooled out-of-fold estimate,
+    its bootstrap interval, and the mean / std across folds. ``folds``
+    has the per-fold metrics and timings.
+    """
+    if not hasattr(store, 'X'):
+        store = open_feature_store(store)
+    if store.y is None:
+        raise ValueError(f"{store.path} has no labels to evaluate against")
+    rf_params = dict(RF_PARAMS, **(rf_params or {}))
+    y = np.asarray(store.y)
+    weights = None if store.weights is None else np.asarray(store.weights, dtype=np.float64)
+    n_classes = max(len(store.classes or ()), int(y.max()) + 1)
+    positive = positive_index(store.classes)
+
+    workdir = tempfile.mkdtemp(prefix="cv-", dir=workdir)
+    try:
+        predictions_path = os.path.join(workdir, "predictions.npy")
+        np.lib.format.open_memmap(predictions_path, mode="w+", dtype=np.int32,
+                                  shape=(len(y),)).flush()
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(fit_fold, store, fold, n_splits, seed, rf_params,
+                                   predictions_path) for fold in range(n_splits)]
+            timings = [future.result() for future in futures]
+        predictions = np.array(np.load(predictions_path, mmap_mode="r"))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    folds = assign_folds(y, n_splits, seed)
+    fold_rows = []
+    for timing in timings:
+        held_out = folds == timing['fold']
+        confusion = confusion_counts(y[held_out], predictions[held_out], n_classes,
+                                     None if weights is None else weights[held_out])
+        scores = metrics_from_confusion(confusion, positive)
+        fold_rows.append(dict(timing, **{name: float(scores[name]) for name in METRICS}))
+    fold_frame = pd.DataFrame(fold_rows)
+
+    confusion = confusion_counts(y, predictions, n_classes, weights)
+    pooled = metrics_from_confusion(confusion, positive)
+    intervals = bootstrap_intervals(confusion, n_bootstrap, confidence, positive, seed)
+    summary = pd.DataFrame([{
+        'metric': name,
+        'estimate': float(pooled[name]),
+        'ci_low': intervals[name][0],
+        'ci_high': intervals[name][1],
+        'fold_mean': fold_frame[name].mean(),
+        'fold_std': fold_frame[name].std(ddof=1),
+    } for name in METRICS])
+    print(f"📏 {n_splits}-fold CV on {len(y):,} rows: accuracy {pooled['accuracy']:.4f} "
+          f"({confidence:.0%} CI {intervals['accuracy'][0]:.4f}-{intervals['accuracy'][1]:.4f})")
+    return summary, fold_frame
+
+
+def _row_bootstrap(y, predictions, n_classes, n_bootstrap, positive, seed=42):
+    """Textbook bootstrap (resample rows) for comparison with the multinomial one."""
+    rng = np.random.default_rng(seed)
+    accuracy = np.empty(n_bootstrap)
+    for b in range(n_bootstrap):
+        sample = rng.integers(0, len(y), len(y))
+        confusion = confusion_counts(y[sample], predictions[sample], n_classes)
+        accuracy[b] = metrics_from_confusion(confusion, positive)['accuracy']
+    return accuracy
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from sklearn.model_selection import train_test_split
+
+    from src.data.feature_store import write_feature_store
+    from src.utils.benchmark import print_benchmark_table
+
+    parser = argparse.ArgumentParser(description="Stratified k-fold + bootstrap CIs")
+    parser.add_argument("--store", default="data/processed/features/train")
+    parser.add_argument("--csv", help="build the store from this labelled CSV instead")
+    parser.add_argument("--synthetic-rows", type=int, default=None,
+                        help="evaluate on a synthetic store of this many rows instead")
+    parser.add_argument("--splits", type=int, default=DEFAULT_SPLITS)
+    parser.add_argument("--bootstrap", type=int, default=DEFAULT_BOOTSTRAP)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count()])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = args.store
+        if args.csv:
+            from src.models.training import build_feature_store
+            store, _ = build_feature_store(args.csv, os.path.join(workdir, "store"))
+        elif args.synthetic_rows:
+            from src.data.schema import apply_schema
+            from src.models.preprocessing import FeaturePreprocessor
+            from src.utils.benchmark import synthetic_kdd_frame
+
+            frame = apply_schema(synthetic_kdd_frame(args.synthetic_rows))
+            prep = FeaturePreprocessor().fit(frame)
+            store = write_feature_store(os.path.join(workdir, "store"), prep.transform(frame),
+                                        (frame['class'] == 'normal').to_numpy().astype(int),
+                                        prep.features, ['anomaly', 'normal'])
+            del frame
+        store = open_feature_store(store) if isinstance(store, str) else store
+
+        # The notebook's single number, for reference.
+        X, y = np.asarray(store.X), np.asarray(store.y)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42,
+                                                            stratify=y)
+        single = RandomForestClassifier(**dict(RF_PARAMS, n_jobs=-1)).fit(X_train, y_train)
+        print(f"🎯 Single 80/20 split accuracy: {np.mean(single.predict(X_test) == y_test):.4f}")
+        del X, X_train, X_test
+
+        rows = []
+        for workers in dict.fromkeys(args.workers):
+            start = time.perf_counter()
+            summary, folds = cross_validate(store, args.splits, n_bootstrap=args.bootstrap,
+                                            max_workers=workers)
+            rows.append({'workers': workers, 'seconds': time.perf_counter() - start,
+                         'fold_fit_seconds': folds['fit_seconds'].sum()})
+        print_benchmark_table("Cross-validated metrics", summary.to_dict('records'))
+        print_benchmark_table("Per fold", folds.to_dict('records'))
+        print_benchmark_table(f"{args.splits}-fold wall time by pool size", rows)
+
+        # Same intervals as resampling rows, without touching the rows.
+        y = np.asarray(store.y)
+        n_classes = max(len(store.classes or ()), int(y.max()) + 1)
+        positive = positive_index(store.classes)
+        predictions = y.copy()  # synthetic predictions at the measured error rate
+        flip = np.random.default_rng(0).random(len(y)) < 1 - summary['estimate'][0]
+        predictions[flip] = (predictions[flip] + 1) % n_classes
+        n_rows_boot = min(args.bootstrap, 200)
+        start = time.perf_counter()
+        row_acc = _row_bootstrap(y, predictions, n_classes, n_rows_boot, positive)
+        row_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        fast = bootstrap_intervals(confusion_counts(y, predictions, n_classes), n_rows_boot,
+                                   positive=positive)
+        fast_seconds = time.perf_counter() - start
+        print_benchmark_table(f"Bootstrap, {n_rows_boot} replicates on {len(y):,} rows", [
+            {'method': 'resample rows', 'seconds': row_seconds,
+             'acc_ci_low': np.percentile(row_acc, 2.5), 'acc_ci_high': np.percentile(row_acc, 97.5)},
+            {'method': 'multinomial', 'seconds': fast_seconds,
+             'acc_ci_low': fast['accuracy'][0], 'acc_ci_high': fast['accuracy'][1]},
+        ])
@@ -0,0 +1,358 @@
+"""
+Drift monitoring with background retraining and hot-swapped models.
+
+``OnlineScorer`` scores batches with the current model while two
+detectors watch the traffic: ``ErrorRateDetector`` compares the error
+rate on labelled feedback over a sliding window against the rate seen
+right after deployment (two-proportion z-test), and ``PSIDetector``
+compares each feature's distribution in tumbling windows against the
+training distribution (population stability index). When either fires,
+labelled feedback is collected from that point on; once enough has
+arrived it is written to a ``FeatureStore`` and a new forest is trained
+on it in a separate, lower-priority worker process. The finished model
+and freshly fitted detectors are built off to the side and replace the
+live ones by reference assignment, so scoring never takes a lock and
+never waits for training.
+"""
+import collections
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+
+from src.data.feature_store import open_feature_store, write_feature_store
+
+RF_PARAMS = {'n_estimators': 100, 'max_depth': 10, 'random_state': 42, 'n_jobs': 1}
+PSI_BINS = 10
+PSI_THRESHOLD = 0.25
+ERROR_Z_THRESHOLD = 3.0
+RETRAIN_NICENESS = 10
+
+
+class ErrorRateDetector:
+    """Sliding-window error rate vs the post-deployment reference rate."""
+
+    def __init__(self, window=2_000, z_threshold=ERROR_Z_THRESHOLD, min_increase=0.01):
+        self.window = window
+        self.z_threshold = z_threshold
+        self.min_increase = min_increase
+        self.reset()
+
+    def fresh(self):
+        """A new, unfitted detector with the same settings."""
+        return ErrorRateDetector(self.window, self.z_threshold, self.min_increase)
+
+    def reset(self):
+        self.reference = None
+        self._ref_n = self._ref_errors = 0
+        self._recent = collections.deque()
+        self._n = self._errors = 0
+
+    def update(self, errors):
+        """Add a batch of 0/1 errors; return True if the rate drifted up."""
+        errors = np.asarray(errors, dtype=bool)
+        if self.reference is None:
+            self._ref_n += len(errors)
+            self._ref_errors += int(errors.sum())
+            if self._ref_n >= self.window:
+                self.reference = self._ref_errors / self._ref_n
+            return False
+        self._recent.append((len(errors), int(errors.sum())))
+        self._n += len(errors)
+        self._errors += int(errors.sum())
+        while self._recent and self._n - self._recent[0][0] >= self.window:
+            n, e = self._recent.popleft()
+            self._n -= n
+            self._errors -= e
+        if self._n < self.window:
+            return False
+        rate = self._errors / self._n
+        pooled = (self._errors + self._ref_errors) / (self._n + self._ref_n)
+        se = np.sqrt(max(pooled * (1 - pooled), 1e-12) * (1 / self._n + 1 / self._ref_n))
+        return rate - self.reference >= self.min_increase and \
+            (rate - self.reference) / se > self.z_threshold
+
+
+class PSIDetector:
+    """Per-feature population stability index over tumbling windows."""
+
+    def __init__(self, reference, window=5_000, bins=PSI_BINS, threshold=PSI_THRESHOLD):
+        self.window = window
+        self.threshold = threshold
+        self.bins = bins
+        self.fit(reference, bins)
+
+    def refitted(self, reference):
+        """A new detector with the same settings, fitted on ``reference``."""
+        return PSIDetector(reference, self.window, self.bins, self.threshold)
+
+    def fit(self, reference, bins=PSI_BINS):
+        reference = np.asarray(reference, dtype=np.float64)
+        quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+        self.edges = [np.unique(np.quantile(column, quantiles)) for column in reference.T]
+        self.expected = [self._proportions(self._counts(column, edges))
+                         for column, edges in zip(reference.T, self.edges)]
+        self._reset_window()
+        self.last_psi = None
+
+    def _reset_window(self):
+        self._counts_window = [np.zeros(len(edges) + 1) for edges in self.edges]
+        self._n = 0
+
+    @staticmethod
+    def _counts(column, edges):
+        return np.bincount(np.searchsorted(edges, column, side="right"),
+                           minlength=len(edges) + 1).astype(np.float64)
+
+    @staticmethod
+    def _proportions(counts):
+        return np.maximum(counts / max(counts.sum(), 1), 1e-4)
+
+    def update(self, X):
+        """Add a batch of feature rows; return True if a window drifted."""
+        X = np.asarray(X)
+        for j, edges in enumerate(self.edges):
+            self._counts_window[j] += self._counts(X[:, j], edges)
+        self._n += len(X)
+        if self._n < self.window:
+            return False
+        actual = [self._proportions(counts) for counts in self._counts_window]
+        self.last_psi = np.array([np.sum((a - e) * np.log(a / e))
+                                  for a, e in zip(actual, self.expected)])
+        self._reset_window()
+        return bool((self.last_psi > self.threshold).any())
+
+
+def _lower_priority():
+    try:
+        os.nice(RETRAIN_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+def retrain_model(store_path, rf_params):
+    """Fit a new forest on a feature store (runs in the worker process)."""
+    from sklearn.ensemble import RandomForestClassifier
+
+    store = open_feature_store(store_path)
+    model = RandomForestClassifier(**rf_params)
+    return model.fit(np.asarray(store.X), np.asarray(store.y))
+
+
+class OnlineScorer:
+    """Live scorer with drift detection and hot-swapped retraining.
+
+    ``score`` never blocks on retraining: it reads the current model
+    reference once per batch, and the retrain callback replaces that
+    reference in one assignment when the new model is ready.
+    """
+
+    def __init__(self, model, reference_X, rf_params=None, min_retrain_rows=5_000,
+                 max_retrain_rows=50_000, error_detector=None, psi_detector=None,
+                 compile_models=True):
+        self.rf_params = dict(RF_PARAMS, **(rf_params or {}))
+        self.min_retrain_rows = min_retrain_rows
+        self.max_retrain_rows = max_retrain_rows
+        self.error_detector = error_detector or ErrorRateDetector()
+        self.psi_detector = psi_detector or PSIDetector(reference_X)
+        self.compile_models = compile_models
+        self.version = 0
+        self.drift_events = []
+        self._model = self._prepare(model)
+        self._labelled = collections.deque()
+        self._labelled_rows = 0
+        self._drift_pending = False
+        self._retraining = None
+        self._lock = threading.Lock()  # guards retrain bookkeeping, not scoring
+        self._pool = ProcessPoolExecutor(max_workers=1, initializer=_lower_priority)
+        self._workdir = tempfile.mkdtemp(prefix="online-retrain-")
+
+    def _prepare(self, model):
+        if self.compile_models:
+            from src.models.compiled_forest import CompiledForest
+            return CompiledForest.from_sklearn(model)
+        return model
+
+    @property
+    def model(self):
+        return self._model
+
+    @property
+    def retraining(self):
+        return self._retraining is not None
+
+    @property
+    def drift_pending(self):
+        """Drift seen; collecting post-drift labels before retraining."""
+        return self._drift_pending
+
+    def score(self, X):
+        """Predict a batch with the live model and watch its distribution."""
+        model = self._model
+        detector = self.psi_detector
+        predictions = model.predict(X)
+        if detector.update(X):
+            self._drift('feature distribution', psi=detector.last_psi.round(3).tolist())
+        return predictions
+
+    def feedback(self, X, y, predictions=None):
+        """Record true labels for scored records (may arrive later)."""
+        if predictions is None:
+            predictions = self._model.predict(X)
+        claim = None
+        with self._lock:
+            self._labelled.append((np.asarray(X, dtype=np.float32), np.asarray(y)))
+            self._labelled_rows += len(y)
+            while self._labelled_rows - len(self._labelled[0][1]) >= self.max_retrain_rows:
+                self._labelled_rows -= len(self._labelled.popleft()[1])
+            if self._drift_pending and self._labelled_rows >= self.min_retrain_rows:
+                claim = self._claim_retrain()
+        if claim is not None:
+            self._start_retrain(*claim)
+        detector = self.error_detector
+        if detector.update(np.asarray(predictions) != np.asarray(y)):
+            self._drift('error rate', reference=detector.reference)
+
+    def _drift(self, kind, **details):
+        with self._lock:
+            if self._drift_pending or self._retraining is not None:
+                return
+            self.drift_events.append(dict(kind=kind, version=self.version, **details))
+            print(f"⚠️ Drift detected ({kind}); collecting labels for model v{self.version + 1}")
+            # Train the replacement on post-drift traffic only.
+            self._labelled.clear()
+            self._labelled_rows = 0
+            self._drift_pending = True
+
+    def _claim_retrain(self):
+        """Snapshot the labelled window and mark a retrain running (caller holds the lock).
+
+        ``_retraining`` is a future resolved once the new model is swapped
+        in (or the retrain failed).
+        """
+        self._drift_pending = False
+        self._retraining = Future()
+        return list(self._labelled), self._labelled_rows, self._retraining
+
+    def _start_retrain(self, batches, n_rows, done):
+        """Write the snapshot to a store and launch the worker (no lock held)."""
+        print(f"🏋️ Retraining model v{self.version + 1} on {n_rows:,} rows")
+        try:
+            X = np.concatenate([batch for batch, _ in batches])
+            y = np.concatenate([labels for _, labels in batches])
+            store_path = os.path.join(self._workdir, f"v{self.version + 1}")
+            write_feature_store(store_path, X, y)
+            future = self._pool.submit(retrain_model, store_path, self.rf_params)
+        except Exception as e:
+            self._retrain_failed(done, e)
+            return
+        future.add_done_callback(lambda future: self._swap(future, X, done))
+
+    def _retrain_failed(self, done, error):
+        print(f"❌ Retraining failed: {error}")
+        with self._lock:
+            self._retraining = None
+        done.set_result(None)
+
+    def _swap(self, future, X_window, done):
+        try:
+            model = self._prepare(future.result())
+        except Exception as e:
+            self._retrain_failed(done, e)
+            return
+        # Build the replacements first, then publish each by reference;
+        # in-flight batches keep using the objects they already read.
+        psi_detector = self.psi_detector.refitted(X_window)
+        error_detector = self.error_detector.fresh()
+        self._model = model
+        self.psi_detector = psi_detector
+        self.error_detector = error_detector
+        with self._lock:
+            self.version += 1
+            self._retraining = None
+        print(f"🔄 Swapped in model v{self.version}")
+        done.set_result(None)
+
+    def wait(self):
+        """Block until a pending retrain (if any) has been swapped in."""
+        future = self._retraining
+        if future is not None:
+            future.result()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        shutil.rmtree(self._workdir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _drifting_stream(n_batches, batch_size, drift_at, seed=42):
+    """Synthetic KDD batches whose attack signature changes at ``drift_at``."""
+    from src.data.schema import apply_schema
+    from src.utils.benchmark import synthetic_kdd_frame
+
+    for i in range(n_batches):
+        frame = apply_schema(synthetic_kdd_frame(batch_size, seed=seed + i))
+        if i >= drift_at:
+            # New campaign: attacks now complete the handshake and push data out.
+            attack = frame['class'] == 'anomaly'
+            frame['flag'] = frame['flag'].where(~attack, 'SF')
+            frame['src_bytes'] = frame['src_bytes'].where(~attack, frame['src_bytes'] + 4_000)
+        yield frame
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from sklearn.ensemble import RandomForestClassifier
+
+    from src.data.schema import apply_schema
+    from src.models.preprocessing import FeaturePreprocessor
+    from src.utils.benchmark import print_benchmark_table, synthetic_kdd_frame
+
+    parser = argparse.ArgumentParser(description="Drift detection + hot-swap simulation")
+    parser.add_argument("--batches", type=int, default=120)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--drift-at", type=int, default=40)
+    parser.add_argument("--interval", type=float, default=0.05,
+                        help="seconds between batches (arrival rate)")
+    args = parser.parse_args()
+
+    train = apply_schema(synthetic_kdd_frame(50_000, seed=7))
+    prep = FeaturePreprocessor().fit(train)
+    X_train = prep.transform(train)
+    y_train = (train['class'] == 'anomaly').to_numpy().astype(int)
+    model = RandomForestClassifier(**RF_PARAMS).fit(X_train, y_train)
+
+    phases = collections.defaultdict(list)
+    accuracy = collections.defaultdict(list)
+    with OnlineScorer(model, X_train, min_retrain_rows=args.batch_size * 10,
+                      psi_detector=PSIDetector(X_train, window=5_000)) as scorer:
+        for i, frame in enumerate(_drifting_stream(args.batches, args.batch_size, args.drift_at)):
+            X = prep.transform(frame)
+            y = (frame['class'] == 'anomaly').to_numpy().astype(int)
+            phase = ('retraining' if scorer.retraining else
+                     'collecting labels' if scorer.drift_pending else
+                     'before drift' if i < args.drift_at else f"after drift, v{scorer.version}")
+            start = time.perf_counter()
+            predictions = scorer.score(X)
+            phases[phase].append((time.perf_counter() - start) * 1000)
+            accuracy[phase].append(float(np.mean(predictions == y)))
+            scorer.feedback(X, y, predictions)
+            time.sleep(args.interval)
+        scorer.wait()
+
+    rows = [{'phase': phase, 'batches': len(ms), 'accuracy': float(np.mean(accuracy[phase])),
+             'p50_ms': float(np.percentile(ms, 50)), 'p99_ms': float(np.percentile(ms, 99))}
+            for phase, ms in phases.items()]
+    print_benchmark_table(f"Scoring {args.batch_size}-row batches through drift", rows)
+    print(f"\nDrift events: {scorer.drift_events}")
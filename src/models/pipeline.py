@@ -0,0 +1,158 @@
+"""
+The notebook's training pipeline as cached stages.
+
+load → encode → split → scale → train_rf / train_lr → evaluate, mirroring
+cell 4 of ``01_data_ingestion_etl.ipynb``. Every stage output is stored
+under ``data/processed/stage_cache`` keyed by the dataset's content hash,
+the stage parameters (``selected_features``, split settings, RF/LR
+hyperparameters, ...) and the stage code, so rerunning after changing only
+the evaluation re-executes only ``evaluate``. Bump ``PIPELINE_CODE_VERSION``
+after changing a helper the stages reach only indirectly (the CSV reader
+behind ``load_kdd_data``, for instance).
+"""
+import numpy as np
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from src.models.encoders import CATEGORICAL_FEATURES, CategoricalEncoder
+from src.models.preprocessing import NUMERICAL_FEATURES, SELECTED_FEATURES
+from src.utils.stages import StageCache, StageRunner
+
+RF_PARAMS = {'n_estimators': 100, 'max_depth': 10, 'random_state': 42, 'n_jobs': -1}
+LR_PARAMS = {'random_state': 42, 'max_iter': 1000, 'n_jobs': -1}
+SPLIT_PARAMS = {'test_size': 0.2, 'random_state': 42}
+PIPELINE_CODE_VERSION = 1
+
+
+def load_stage(filepath, dataset_fingerprint, selected_features, deduplicate):
+    """Selected features + class (+ sample_weight) from the raw CSV."""
+    from src.data.dedup import WEIGHT_COLUMN, deduplicate_frame
+    from src.data.ingestion import load_kdd_data
+
+    data = load_kdd_data("train", filepath=filepath)
+    if data is None:
+        raise RuntimeError(f"Could not load training data from {filepath}")
+    data = data[selected_features + ['class']]
+    if deduplicate:
+        data = deduplicate_frame(data)
+        weights = data.pop(WEIGHT_COLUMN).to_numpy().astype(np.float64)
+    else:
+        weights = np.ones(len(data))
+    return {'data': data, 'weights': weights}
+
+
+def encode_stage(loaded, selected_features, categorical_features, hash_widths):
+    """Integer-code the categorical features and the target."""
+    data = loaded['data']
+    categorical = [f for f in selected_features if f in categorical_features]
+    encoder = CategoricalEncoder(hash_widths=hash_widths).fit(data, categorical)
+    X = encoder.transform(data[selected_features])
+    target_encoder = LabelEncoder()
+    y = target_encoder.fit_transform(data['class'].astype(str))
+    return {'X': X, 'y': y, 'weights': loaded['weights'],
+            'encoder': encoder, 'target_encoder': target_encoder}
+
+
+def split_stage(encoded, test_size, random_state):
+    from sklearn.model_selection import train_test_split
+
+    X_train, X_test, y_train, y_test, w_train, w_test = train_test_split(
+        encoded['X'], encoded['y'], encoded['weights'], test_size=test_size,
+        random_state=random_state, stratify=encoded['y'])
+    return {'X_train': X_train, 'X_test': X_test, 'y_train': y_train, 'y_test': y_test,
+            'w_train': w_train, 'w_test': w_test}
+
+
+def scale_stage(split, numerical_features):
+    """Standardize the numerical features (fitted on the training split)."""
+    numerical = [f for f in numerical_features if f in split['X_train'].columns]
+    scaler = StandardScaler()
+    X_train = split['X_train'].copy()
+    X_test = split['X_test'].copy()
+    X_train[numerical] = scaler.fit_transform(X_train[numerical])
+    X_test[numerical] = scaler.transform(X_test[numerical])
+    return {'X_train': X_train, 'X_test': X_test, 'scaler': scaler}
+
+
+def train_rf_stage(split, scaled, rf_params):
+    from sklearn.ensemble import RandomForestClassifier
+
+    model = RandomForestClassifier(**rf_params)
+    return model.fit(scaled['X_train'], split['y_train'], sample_weight=split['w_train'])
+
+
+def train_lr_stage(split, scaled, lr_params):
+    from sklearn.linear_model import LogisticRegression
+
+    model = LogisticRegression(**lr_params)
+    return model.fit(scaled['X_train'], split['y_train'], sample_weight=split['w_train'])
+
+
+def evaluate_stage(split, scaled, rf_model, lr_model):
+    """Weighted accuracy/precision/recall/F1 of both models on the test split."""
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+
+    results = {}
+    for name, model in [('Random Forest', rf_model), ('Logistic Regression', lr_model)]:
+        predictions = model.predict(scaled['X_test'])
+        y_test, w_test = split['y_test'], split['w_test']
+        results[name] = {
+            'accuracy': accuracy_score(y_test, predictions, sample_weight=w_test),
+            'precision': precision_score(y_test, predictions, sample_weight=w_test),
+            'recall': recall_score(y_test, predictions, sample_weight=w_test),
+            'f1': f1_score(y_test, predictions, sample_weight=w_test),
+        }
+    return results
+
+
+def build_training_pipeline(filepath=None, selected_features=SELECTED_FEATURES,
+                            rf_params=None, lr_params=None, split_params=None,
+                            deduplicate=False, hash_widths=None, cache=None):
+    """Declare the notebook pipeline on a ``StageRunner``."""
+    from src.data.ingestion import resolve_kdd_path
+
+    filepath = filepath or resolve_kdd_path("train")
+    runner = StageRunner(cache if cache is not None else StageCache(), PIPELINE_CODE_VERSION)
+    selected_features = list(selected_features)
+    runner.add('load', load_stage, filepath=filepath,
+               dataset_fingerprint=runner.cache.fingerprint(filepath),
+               selected_features=selected_features, deduplicate=deduplicate)
+    runner.add('encode', encode_stage, deps=['load'], selected_features=selected_features,
+               categorical_features=CATEGORICAL_FEATURES, hash_widths=hash_widths or {})
+    runner.add('split', split_stage, deps=['encode'], **(split_params or SPLIT_PARAMS))
+    runner.add('scale', scale_stage, deps=['split'], numerical_features=NUMERICAL_FEATURES)
+    runner.add('train_rf', train_rf_stage, deps=['split', 'scale'],
+               rf_params=rf_params or RF_PARAMS)
+    runner.add('train_lr', train_lr_stage, deps=['split', 'scale'],
+               lr_params=lr_params or LR_PARAMS)
+    runner.add('evaluate', evaluate_stage, deps=['split', 'scale', 'train_rf', 'train_lr'])
+    return runner
+
+
+def run_training_pipeline(target='evaluate', **kwargs):
+    """Run the pipeline up to ``target`` and return that stage's output."""
+    return build_training_pipeline(**kwargs).run(target)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.utils.benchmark import print_benchmark_table
+
+    parser = argparse.ArgumentParser(description="Run the cached training pipeline")
+    parser.add_argument("csv", nargs="?", help="labelled KDD CSV (default: Train_data.csv)")
+    parser.add_argument("--target", default="evaluate")
+    parser.add_argument("--n-estimators", type=int, default=RF_PARAMS['n_estimators'])
+    parser.add_argument("--max-depth", type=int, default=RF_PARAMS['max_depth'])
+    parser.add_argument("--deduplicate", action="store_true")
+    parser.add_argument("--cache-root", default=None)
+    args = parser.parse_args()
+
+    rf_params = dict(RF_PARAMS, n_estimators=args.n_estimators, max_depth=args.max_depth)
+    cache = StageCache(args.cache_root) if args.cache_root else None
+    runner = build_training_pipeline(args.csv, rf_params=rf_params,
+                                     deduplicate=args.deduplicate, cache=cache)
+    output = runner.run(args.target)
+    print_benchmark_table("Pipeline stages", runner.log)
+    if args.target == 'evaluate':
+        for name, metrics in output.items():
+            print(f"{name:20} " + "  ".join(f"{k}={v:.3f}" for k, v in metrics.items()))
@@ -0,0 +1,245 @@
+"""
+Latency-aware pruning and compaction of a trained random forest.
+
+Starting from the saved model, ``prune_forest`` greedily drops the tree
+whose removal hurts validation accuracy least, then collapses low-value
+subtrees: first by capping the depth, then by turning nodes reached by
+too few training samples into leaves. Every step is kept only while
+validation accuracy stays within ``tolerance`` of the original model's.
+Each accepted step is recorded with accuracy, node count, pickled size
+and measured single-row / batch latency, giving the accuracy versus
+latency/size curve to choose from. The result is an ordinary
+``RandomForestClassifier`` artifact.
+"""
+import copy
+import io
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.tree._tree import Tree
+
+from src.models.compiled_forest import CompiledForest
+
+TREE_LEAF = -1
+TREE_UNDEFINED = -2
+DEFAULT_TOLERANCE = 0.002
+# Greedy selection on one validation split overfits it as the ensemble
+# shrinks; keep enough trees for the averaging to stay meaningful.
+DEFAULT_MIN_TREES = 10
+MIN_SAMPLE_FRACTIONS = [1e-4, 3e-4, 1e-3, 3e-3, 1e-2, 3e-2]
+LATENCY_BATCH = 1_000
+
+
+def node_depths(tree):
+    """Depth of every node of a fitted ``sklearn`` tree."""
+    depth = np.zeros(tree.node_count, dtype=np.intp)
+    for node in range(tree.node_count):  # children always follow their parent
+        if tree.children_left[node] != TREE_LEAF:
+            depth[tree.children_left[node]] = depth[node] + 1
+            depth[tree.children_right[node]] = depth[node] + 1
+    return depth
+
+
+def collapse_tree(estimator, collapse):
+    """Copy of ``estimator`` with every node in ``collapse`` made a leaf.
+
+    Collapsed nodes keep the class distribution sklearn stores for every
+    node; their (now unreachable) subtrees are dropped and the remaining
+    nodes renumbered.
+    """
+    state = estimator.tree_.__getstate__()
+    nodes, values = state['nodes'], state['values']
+    keep, stack = [], [0]
+    while stack:
+        node = stack.pop()
+        keep.append(node)
+        if nodes['left_child'][node] != TREE_LEAF and not collapse[node]:
+            stack.extend((nodes['right_child'][node], nodes['left_child'][node]))
+    keep = np.asarray(sorted(keep))
+    new_id = np.full(len(nodes), TREE_LEAF, dtype=np.intp)
+    new_id[keep] = np.arange(len(keep))
+
+    kept = nodes[keep].copy()
+    is_leaf = (kept['left_child'] == TREE_LEAF) | collapse[keep]
+    kept['left_child'] = np.where(is_leaf, TREE_LEAF, new_id[kept['left_child']])
+    kept['right_child'] = np.where(is_leaf, TREE_LEAF, new_id[kept['right_child']])
+    kept['feature'] = np.where(is_leaf, TREE_UNDEFINED, kept['feature'])
+    kept['threshold'] = np.where(is_leaf, TREE_UNDEFINED, kept['threshold'])
+
+    depth = node_depths(estimator.tree_)[keep]
+    tree = Tree(*estimator.tree_.__reduce__()[1])
+    tree.__setstate__({'max_depth': int(depth.max()), 'node_count': len(keep),
+                       'nodes': kept, 'values': np.ascontiguousarray(values[keep])})
+    pruned = copy.copy(estimator)
+    pruned.tree_ = tree
+    return pruned
+
+
+def with_estimators(model, estimators):
+    """Shallow copy of a forest using ``estimators`` as its trees."""
+    forest = copy.copy(model)
+    forest.estimators_ = list(estimators)
+    forest.n_estimators = len(estimators)
+    return forest
+
+
+def artifact_bytes(model):
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell()
+
+
+def _median_ms(fn, X, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def describe(model, X_valid, y_valid, step, latency_batch=LATENCY_BATCH):
+    """One curve point: accuracy, size and latency of ``model``."""
+    compiled = CompiledForest.from_sklearn(model)
+    batch = X_valid[:latency_batch]
+    return {
+        'step': step,
+        'n_trees': len(model.estimators_),
+        'n_nodes': compiled.n_nodes,
+        'max_depth': compiled.max_depth,
+        'accuracy': float(np.mean(compiled.predict(X_valid) == y_valid)),
+        'size_kb': artifact_bytes(model) / 1024,
+        'row_latency_ms': _median_ms(compiled.predict, batch[:1], 50),
+        'batch_latency_ms': _median_ms(compiled.predict, batch, 5),
+    }
+
+
+def drop_trees(model, X_valid, y_valid, min_accuracy, min_trees=1):
+    """Greedy backward elimination of whole trees.
+
+    Yields ``(kept_indices, accuracy)`` after each removal that keeps
+    accuracy at or above ``min_accuracy``.
+    """
+    classes = model.classes_
+    # Per-tree leaf probabilities, as the forest averages them.
+    probas = np.stack([tree.predict_proba(X_valid) for tree in model.estimators_])
+    kept = list(range(len(model.estimators_)))
+    total = probas.sum(axis=0)
+    while len(kept) > max(min_trees, 1):
+        without = total[np.newaxis] - probas[kept]
+        accuracy = (classes[np.argmax(without, axis=2)] == y_valid).mean(axis=1)
+        best = int(np.argmax(accuracy))
+        if accuracy[best] < min_accuracy:
+            return
+        total = without[best]
+        kept.pop(best)
+        yield list(kept), float(accuracy[best])
+
+
+def prune_forest(model, X_valid, y_valid, tolerance=DEFAULT_TOLERANCE,
+                 min_trees=DEFAULT_MIN_TREES, min_sample_fractions=MIN_SAMPLE_FRACTIONS,
+                 latency_batch=LATENCY_BATCH):
+    """Return ``(pruned_model, curve)``.
+
+    ``curve`` is a DataFrame with one row per evaluated model; ``accepted``
+    marks the steps that stayed within ``tolerance`` and were built upon.
+    """
+    X_valid = np.asarray(X_valid, dtype=np.float32)
+    y_valid = np.asarray(y_valid)
+    points = [dict(describe(model, X_valid, y_valid, 'original', latency_batch), accepted=True)]
+    min_accuracy = points[0]['accuracy'] - tolerance
+    print(f"🌲 Original: {points[0]['n_trees']} trees, accuracy {points[0]['accuracy']:.4f}; "
+          f"floor {min_accuracy:.4f}")
+
+    best = model
+    kept = None
+    for kept, _ in drop_trees(model, X_valid, y_valid, min_accuracy, min_trees):
+        if len(kept) % 10 == 0 or len(kept) < 10:
+            candidate = with_estimators(model, [model.estimators_[i] for i in kept])
+            points.append(dict(describe(candidate, X_valid, y_valid, 'drop trees',
+                                        latency_batch), accepted=True))
+    if kept is not None:
+        best = with_estimators(model, [model.estimators_[i] for i in kept])
+    print(f"✂️ Kept {len(best.estimators_)} trees")
+
+    def try_collapse(step, masks):
+        nonlocal best
+        candidate = with_estimators(best, [collapse_tree(tree, mask) for tree, mask
+                                           in zip(best.estimators_, masks(best))])
+        point = describe(candidate, X_valid, y_valid, step, latency_batch)
+        point['accepted'] = point['accuracy'] >= min_accuracy
+        points.append(point)
+        if point['accepted']:
+            best = candidate
+        return point['accepted']
+
+    for depth in range(max(t.tree_.max_depth for t in best.estimators_) - 1, 0, -1):
+        if not try_collapse(f"max_depth={depth}",
+                            lambda forest: [node_depths(t.tree_) >= depth
+                                            for t in forest.estimators_]):
+            break
+    for fraction in min_sample_fractions:
+        if not try_collapse(f"min_samples={fraction:g}",
+                            lambda forest: [t.tree_.weighted_n_node_samples
+                                            < fraction * t.tree_.weighted_n_node_samples[0]
+                                            for t in forest.estimators_]):
+            break
+
+    final = describe(best, X_valid, y_valid, 'final', latency_batch)
+    points.append(dict(final, accepted=True))
+    print(f"✅ Pruned: {final['n_trees']} trees, {final['n_nodes']:,} nodes "
+          f"(from {points[0]['n_nodes']:,}), accuracy {final['accuracy']:.4f}")
+    return best, pd.DataFrame(points)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import warnings
+
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import train_test_split
+
+    from src.data.feature_store import open_feature_store
+    from src.models.compiled_forest import MODEL_FILENAME
+    from src.models.encoders import ARTIFACT_DIR
+    from src.utils.benchmark import print_benchmark_table
+
+    parser = argparse.ArgumentParser(description="Prune a trained forest within an accuracy tolerance")
+    parser.add_argument("--model", default=os.path.join(ARTIFACT_DIR, MODEL_FILENAME))
+    parser.add_argument("--valid-store", default="data/processed/features/test")
+    parser.add_argument("--csv", help="train the notebook's forest on this labelled CSV and "
+                                      "prune it on a held-out split instead")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--min-trees", type=int, default=DEFAULT_MIN_TREES)
+    parser.add_argument("--output", default=os.path.join(ARTIFACT_DIR, "rf_security_model_pruned.pkl"))
+    parser.add_argument("--curve", default=None, help="write the curve as CSV here")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+    if args.csv:
+        from src.models.training import build_feature_store
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as workdir:
+            store, _ = build_feature_store(args.csv, os.path.join(workdir, "store"))
+            X, y = np.array(store.X), np.array(store.y)
+        X_train, X_valid, y_train, y_valid = train_test_split(X, y, test_size=0.2,
+                                                              random_state=42, stratify=y)
+        model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42,
+                                       n_jobs=-1).fit(X_train, y_train)
+    else:
+        model = joblib.load(args.model)
+        valid = open_feature_store(args.valid_store)
+        X_valid, y_valid = np.asarray(valid.X), np.asarray(valid.y)
+
+    pruned, curve = prune_forest(model, X_valid, y_valid, tolerance=args.tolerance,
+                                 min_trees=args.min_trees)
+    print_benchmark_table("Accuracy vs latency/size", curve.to_dict('records'))
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    joblib.dump(pruned, args.output)
+    print(f"📁 Saved pruned model to {args.output}")
+    if args.curve:
+        curve.to_csv(args.curve, index=False)
@@ -0,0 +1,141 @@
+"""
+Out-of-core StandardScaler fitting over streamed chunks.
+
+``StreamingStandardScaler`` accumulates count, mean and the sum of squared
+deviations per column with the numerically stable Welford/Chan update, so
+it can be fitted chunk by chunk from the ingestion generator and partial
+results from parallel workers can be merged exactly. The fitted scaler
+converts to a regular sklearn ``StandardScaler`` and is saved as the same
+``feature_scaler.pkl`` artifact the notebook writes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from src.models.encoders import ARTIFACT_DIR
+from src.models.preprocessing import NUMERICAL_FEATURES, SCALER_FILENAME
+
+
+class StreamingStandardScaler:
+    """Mergeable running mean/variance per column (optionally weighted)."""
+
+    def __init__(self, columns=NUMERICAL_FEATURES):
+        self.columns = list(columns)
+        n = len(self.columns)
+        self.n_samples_seen_ = 0.0
+        self.mean_ = np.zeros(n)
+        self._m2 = np.zeros(n)
+
+    def _merge_stats(self, count, mean, m2):
+        if not count:
+            return self
+        total = self.n_samples_seen_ + count
+        delta = mean - self.mean_
+        self.mean_ = self.mean_ + delta * (count / total)
+        self._m2 = self._m2 + m2 + delta ** 2 * (self.n_samples_seen_ * count / total)
+        self.n_samples_seen_ = total
+        return self
+
+    def partial_fit(self, chunk, sample_weight=None):
+        """Fold one chunk (DataFrame with ``columns``, or 2-D array) in."""
+        if hasattr(chunk, 'columns'):
+            values = chunk[self.columns].to_numpy(dtype=np.float64)
+        else:
+            values = np.asarray(chunk, dtype=np.float64)
+        if not len(values):
+            return self
+        if sample_weight is None:
+            count = float(len(values))
+            mean = values.mean(axis=0)
+            m2 = ((values - mean) ** 2).sum(axis=0)
+        else:
+            weights = np.asarray(sample_weight, dtype=np.float64)
+            count = weights.sum()
+            mean = weights @ values / count
+            m2 = weights @ ((values - mean) ** 2)
+        return self._merge_stats(count, mean, m2)
+
+    def merge(self, other):
+        """Combine with statistics computed on a disjoint part of the data."""
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge scalers fitted on different columns")
+        return self._merge_stats(other.n_samples_seen_, other.mean_, other._m2)
+
+    def fit_chunks(self, chunks, weight_column=None):
+        """Fit over a chunk generator (e.g. ``iter_kdd_chunks``)."""
+        for chunk in chunks:
+            weights = None if weight_column is None else chunk[weight_column]
+            self.partial_fit(chunk, sample_weight=weights)
+        return self
+
+    @property
+    def var_(self):
+        if not self.n_samples_seen_:
+            return np.zeros(len(self.columns))
+        return self._m2 / self.n_samples_seen_
+
+    @property
+    def scale_(self):
+        std = np.sqrt(self.var_)
+        return np.where(std < 10 * np.finfo(std.dtype).eps, 1.0, std)
+
+    @property
+    def feature_names_in_(self):
+        return np.asarray(self.columns, dtype=object)
+
+    def transform(self, X):
+        if hasattr(X, 'columns'):
+            X = X[self.columns].to_numpy(dtype=np.float64)
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+    def to_sklearn(self):
+        """Return an equivalent fitted ``sklearn.preprocessing.StandardScaler``."""
+        scaler = StandardScaler()
+        scaler.mean_ = self.mean_.copy()
+        scaler.var_ = self.var_
+        scaler.scale_ = self.scale_
+        scaler.n_samples_seen_ = (int(self.n_samples_seen_)
+                                  if float(self.n_samples_seen_).is_integer()
+                                  else self.n_samples_seen_)
+        scaler.n_features_in_ = len(self.columns)
+        scaler.feature_names_in_ = self.feature_names_in_
+        return scaler
+
+    @classmethod
+    def from_sklearn(cls, scaler, columns=None):
+        """Resume streaming from a fitted ``StandardScaler``."""
+        columns = columns or list(getattr(scaler, 'feature_names_in_', NUMERICAL_FEATURES))
+        streaming = cls(columns)
+        count = np.max(scaler.n_samples_seen_)
+        streaming._merge_stats(float(count), np.asarray(scaler.mean_, dtype=np.float64),
+                               np.asarray(scaler.var_, dtype=np.float64) * count)
+        return streaming
+
+    def save(self, directory=ARTIFACT_DIR, filename=SCALER_FILENAME):
+        """Write ``feature_scaler.pkl`` as a plain sklearn ``StandardScaler``."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, filename)
+        joblib.dump(self.to_sklearn(), path)
+        return path
+
+
+def _fit_shard(filepath, columns):
+    from src.data.ingestion import iter_kdd_chunks
+
+    return StreamingStandardScaler(columns).fit_chunks(
+        iter_kdd_chunks(filepath=filepath, usecols=columns))
+
+
+def fit_scaler_parallel(source, columns=NUMERICAL_FEATURES, max_workers=None):
+    """Fit one partial scaler per shard on a process pool and merge them."""
+    from src.data.shards import discover_shards
+
+    scaler = StreamingStandardScaler(columns)
+    paths = discover_shards(source)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for partial in pool.map(_fit_shard, paths, [list(columns)] * len(paths)):
+            scaler.merge(partial)
+    return scaler
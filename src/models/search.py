@@ -0,0 +1,185 @@
+"""
+Parallel successive-halving search over the random forest hyperparameters.
+
+Every candidate configuration is first trained on a small row sample;
+only the best ``1/eta`` survive to the next rung, which trains on ``eta``
+times more rows, until the survivors are trained on the full data. Each
+evaluation reports validation accuracy and the measured inference latency
+of the fitted model, and candidates over ``latency_budget_ms`` are never
+promoted; a rung where every candidate is over budget ends the search.
+
+Fits run on a process pool. Latency is timed afterwards in the parent,
+one model at a time with the pool idle, so it is not inflated by other
+candidates training on the same cores. Training and validation data are
+memory-mapped ``FeatureStore`` directories: a store pickles to its path,
+so workers map the same pages instead of receiving a copy of the matrix.
+"""
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from src.data.feature_store import open_feature_store
+from src.models.training import sample_rows
+
+FEATURE_STORE_DIR = "data/processed/features"
+SEARCH_SPACE = {
+    'n_estimators': [25, 50, 100, 200],
+    'max_depth': [6, 8, 10, 14, None],
+    'max_features': ['sqrt', None],
+    'min_samples_leaf': [1, 5],
+}
+MAX_VALID_ROWS = 100_000
+LATENCY_REPEATS = 20
+
+
+def candidate_grid(space=SEARCH_SPACE, n_candidates=None, seed=42):
+    """All combinations of ``space``, or a random subset of ``n_candidates``."""
+    names = list(space)
+    grid = [dict(zip(names, values)) for values in itertools.product(*space.values())]
+    if n_candidates is not None and n_candidates < len(grid):
+        picks = np.random.default_rng(seed).choice(len(grid), n_candidates, replace=False)
+        grid = [grid[i] for i in sorted(picks)]
+    return grid
+
+
+def measure_latency(model, X, batch_size=1, repeats=LATENCY_REPEATS):
+    """Median wall time in ms of ``model.predict`` on one batch."""
+    batch = np.ascontiguousarray(X[:batch_size])
+    model.predict(batch)  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(batch)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def evaluate_candidate(params, train_store, valid_store, n_rows, seed=42,
+                       max_valid_rows=MAX_VALID_ROWS):
+    """Fit on ``n_rows`` sampled training rows and score validation accuracy.
+
+    Runs inside pool workers; the stores arrive as paths and are mapped.
+    The fitted model is returned under ``'model'`` for latency timing.
+    """
+    rng = np.random.default_rng(seed)
+    X, y, weights = sample_rows(train_store, n_rows, rng)
+    start = time.perf_counter()
+    model = RandomForestClassifier(random_state=seed, n_jobs=1, **params)
+    model.fit(X, y, sample_weight=weights)
+    fit_seconds = time.perf_counter() - start
+
+    X_valid = valid_store.X[:max_valid_rows]
+    y_valid = valid_store.y[:max_valid_rows]
+    w_valid = None if valid_store.weights is None else valid_store.weights[:max_valid_rows]
+    accuracy = float(np.average(model.predict(X_valid) == y_valid, weights=w_valid))
+    return {
+        'accuracy': accuracy,
+        'fit_seconds': fit_seconds,
+        'n_rows': len(y),
+        'model': model,
+    }
+
+
+def _over_budget(result, latency_budget_ms):
+    return latency_budget_ms is not None and result['latency_ms'] > latency_budget_ms
+
+
+def _rank(results, latency_budget_ms):
+    """Sort by accuracy (then latency); over-budget candidates go last."""
+    return sorted(results, key=lambda r: (_over_budget(r, latency_budget_ms),
+                                          -r['accuracy'], r['latency_ms']))
+
+
+def successive_halving(train_store, valid_store, candidates=None, eta=3, min_rows=5_000,
+                       latency_budget_ms=None, latency_batch=1, max_workers=None, seed=42):
+    """Run the search and return ``(best_params, history)``.
+
+    ``history`` is a DataFrame with one row per evaluation (rung, params,
+    accuracy, latency_ms, fit_seconds, n_rows).
+    """
+    if not hasattr(train_store, 'X'):
+        train_store = open_feature_store(train_store)
+    if not hasattr(valid_store, 'X'):
+        valid_store = open_feature_store(valid_store)
+    candidates = candidate_grid() if candidates is None else list(candidates)
+
+    history = []
+    survivors = candidates
+    n_rows = min(min_rows, len(train_store))
+    rung = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            futures = [pool.submit(evaluate_candidate, params, train_store, valid_store,
+                                   n_rows, seed) for params in survivors]
+            results = [dict(future.result(), params=params, rung=rung)
+                       for params, future in zip(survivors, futures)]
+            # Timed serially once the rung's fits are done, so no worker competes.
+            for result in results:
+                model = result.pop('model')
+                result['latency_ms'] = measure_latency(model, valid_store.X, latency_batch)
+            history.extend(results)
+            ranked = _rank(results, latency_budget_ms)
+            best = ranked[0]
+            print(f"🔎 Rung {rung}: {len(survivors)} candidates on {n_rows:,} rows, "
+                  f"best accuracy {best['accuracy']:.4f} at {best['latency_ms']:.2f} ms")
+            eligible = [r for r in ranked if not _over_budget(r, latency_budget_ms)]
+            if n_rows >= len(train_store) or not eligible:
+                break
+            survivors = [r['params'] for r in eligible[:max(1, len(ranked) // eta)]]
+            # A lone survivor goes straight to the full data.
+            n_rows = len(train_store) if len(survivors) == 1 else min(n_rows * eta,
+                                                                     len(train_store))
+            rung += 1
+
+    if latency_budget_ms is not None and best['latency_ms'] > latency_budget_ms:
+        print(f"⚠️ No candidate met the {latency_budget_ms} ms latency budget")
+    frame = pd.DataFrame([{**{k: v for k, v in r.items() if k != 'params'}, **r['params']}
+                          for r in history])
+    return best['params'], frame
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import tempfile
+
+    from src.data.feature_store import write_feature_store
+    from src.models.training import build_feature_store
+    from src.utils.benchmark import print_benchmark_table
+
+    parser = argparse.ArgumentParser(description="Successive-halving RF hyperparameter search")
+    parser.add_argument("--train-store", default=os.path.join(FEATURE_STORE_DIR, "train"))
+    parser.add_argument("--valid-store", default=os.path.join(FEATURE_STORE_DIR, "test"))
+    parser.add_argument("--csv", help="build train/valid stores from this labelled CSV instead")
+    parser.add_argument("--candidates", type=int, default=None)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--min-rows", type=int, default=5_000)
+    parser.add_argument("--latency-budget-ms", type=float, default=None)
+    parser.add_argument("--latency-batch", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        train_store, valid_store = args.train_store, args.valid_store
+        if args.csv:
+            full, _ = build_feature_store(args.csv, os.path.join(workdir, "full"))
+            is_valid = np.random.default_rng(42).random(len(full)) < 0.2
+            train_store = write_feature_store(os.path.join(workdir, "train"), full.X[~is_valid],
+                                              full.y[~is_valid], full.feature_names, full.classes)
+            valid_store = write_feature_store(os.path.join(workdir, "valid"), full.X[is_valid],
+                                              full.y[is_valid], full.feature_names, full.classes)
+
+        start = time.perf_counter()
+        best, history = successive_halving(
+            train_store, valid_store, candidate_grid(n_candidates=args.candidates),
+            eta=args.eta, min_rows=args.min_rows, latency_budget_ms=args.latency_budget_ms,
+            latency_batch=args.latency_batch, max_workers=args.workers)
+        elapsed = time.perf_counter() - start
+
+    final = history[history['rung'] == history['rung'].max()]
+    print_benchmark_table("Final rung", final.to_dict('records'))
+    print(f"\n🏆 Best: {best}  ({len(history)} evaluations in {elapsed:.1f}s)")
@@ -0,0 +1,207 @@
+"""
+Out-of-core random forest training within a fixed memory budget.
+
+The notebook fits ``RandomForestClassifier(n_estimators=100, max_depth=10)``
+on the whole in-memory frame, which stops scaling long before the full
+4.9M-row KDD set. Here the CSV is streamed once into a memory-mapped
+``FeatureStore`` (float32, already encoded and scaled) and every tree is
+fitted on its own random row sample drawn block by block from the map.
+The sample size is derived from ``memory_budget_mb``, so peak memory
+depends on the budget rather than on the dataset size. The trees are
+assembled into a regular ``RandomForestClassifier``, a drop-in
+replacement for ``rf_security_model.pkl``.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from src.data.feature_store import FeatureStoreWriter, open_feature_store
+from src.models.encoders import CategoricalEncoder
+from src.models.preprocessing import (CATEGORICAL_FEATURES, NUMERICAL_FEATURES,
+                                      SELECTED_FEATURES, FeaturePreprocessor)
+from src.models.scaler import StreamingStandardScaler
+
+TARGET_COLUMN = 'class'
+DEFAULT_MEMORY_BUDGET_MB = 256
+SAMPLE_BLOCK_ROWS = 1_000_000
+# Per sampled row, on top of the float32 features: the label and sample
+# weight as sklearn sees them (float64), its sample index array and
+# per-node scratch buffers.
+TREE_BYTES_PER_ROW = 64
+MAX_INT = np.iinfo(np.int32).max
+
+
+def fit_preprocessor_streaming(chunks, features=SELECTED_FEATURES):
+    """Fit vocabularies, label classes and scaler in one pass over ``chunks``.
+
+    Returns ``(preprocessor, target_encoder)``; the target encoder is a
+    ``CategoricalEncoder`` over ``class`` whose codes match ``LabelEncoder``.
+    """
+    categorical = [f for f in features if f in CATEGORICAL_FEATURES]
+    numerical = [f for f in features if f in NUMERICAL_FEATURES]
+    seen = {column: set() for column in categorical + [TARGET_COLUMN]}
+    scaler = StreamingStandardScaler(numerical)
+    for chunk in chunks:
+        for column, values in seen.items():
+            values.update(chunk[column].astype(str).unique())
+        scaler.partial_fit(chunk)
+    vocabularies = {column: sorted(seen[column]) for column in categorical}
+    preprocessor = FeaturePreprocessor(CategoricalEncoder(vocabularies), scaler.mean_,
+                                       scaler.scale_, features, numerical)
+    return preprocessor, CategoricalEncoder({TARGET_COLUMN: sorted(seen[TARGET_COLUMN])})
+
+
+def build_feature_store(filepath, store_path, chunksize=None, features=SELECTED_FEATURES):
+    """Stream a labelled KDD CSV into an encoded, scaled feature store.
+
+    Two passes over the file (fit, then transform) with one chunk in
+    memory at a time. Returns ``(store, preprocessor)``.
+    """
+    from src.data.ingestion import DEFAULT_CHUNK_SIZE, iter_kdd_chunks
+
+    chunksize = chunksize or DEFAULT_CHUNK_SIZE
+    columns = list(features) + [TARGET_COLUMN]
+
+    def chunks():
+        return iter_kdd_chunks(filepath=filepath, chunksize=chunksize, usecols=columns)
+
+    preprocessor, target_encoder = fit_preprocessor_streaming(chunks(), features)
+    classes = list(target_encoder.vocabularies[TARGET_COLUMN])
+    with FeatureStoreWriter(store_path, features, classes,
+                            {'source': os.path.abspath(filepath)}) as writer:
+        for chunk in chunks():
+            writer.append(preprocessor.transform(chunk),
+                          target_encoder.encode(TARGET_COLUMN, chunk[TARGET_COLUMN]))
+    return writer.store, preprocessor
+
+
+def rows_for_budget(n_features, memory_budget_mb):
+    """How many sampled rows one tree can be fitted on within the budget."""
+    bytes_per_row = n_features * np.dtype(np.float32).itemsize + TREE_BYTES_PER_ROW
+    return max(1, int(memory_budget_mb * 2**20 // bytes_per_row))
+
+
+def sample_rows(store, n_samples, rng, block_rows=SAMPLE_BLOCK_ROWS):
+    """Draw ~``n_samples`` rows uniformly without replacement, block by block.
+
+    Blocks are read sequentially from the memory map and only the selected
+    rows are copied, so the full matrix is never resident at once.
+    """
+    n_rows = len(store)
+    if n_samples >= n_rows:
+        return (np.array(store.X), np.array(store.y),
+                None if store.weights is None else np.array(store.weights))
+    fraction = n_samples / n_rows
+    X_parts, y_parts, w_parts = [], [], []
+    for start in range(0, n_rows, block_rows):
+        stop = min(start + block_rows, n_rows)
+        mask = rng.random(stop - start) < fraction
+        X_parts.append(store.X[start:stop][mask])
+        y_parts.append(store.y[start:stop][mask])
+        if store.weights is not None:
+            w_parts.append(store.weights[start:stop][mask])
+    return (np.concatenate(X_parts), np.concatenate(y_parts),
+            np.concatenate(w_parts) if w_parts else None)
+
+
+def _fit_tree(store, n_samples, seed, tree_params, n_classes):
+    rng = np.random.default_rng(seed)
+    X, y, weights = sample_rows(store, n_samples, rng)
+    if len(np.unique(y)) != n_classes:
+        raise ValueError(f"A tree sample of {len(y)} rows is missing a class; "
+                         "raise memory_budget_mb or max_samples")
+    tree = DecisionTreeClassifier(random_state=seed, **tree_params)
+    return tree.fit(X, y, sample_weight=weights)
+
+
+def train_forest_out_of_core(store, n_estimators=100, max_depth=10, max_features='sqrt',
+                             memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, max_samples=None,
+                             n_jobs=1, random_state=42):
+    """Fit a random forest on a ``FeatureStore`` (or its path) tree by tree.
+
+    Each tree sees its own uniform subsample (in place of a bootstrap) of
+    at most ``max_samples`` rows; by default as many rows as fit into
+    ``memory_budget_mb`` split across the ``n_jobs`` trees fitted
+    concurrently on threads. The trees are fitted on arrays, so the forest
+    takes arrays too; feature names stay on the store (and the bundle).
+    """
+    if not hasattr(store, 'X'):
+        store = open_feature_store(store)
+    if store.y is None:
+        raise ValueError(f"Feature store {store.path} has no labels")
+    n_jobs = max(1, n_jobs if n_jobs > 0 else (os.cpu_count() or 1))
+    n_samples = rows_for_budget(store.shape[1], memory_budget_mb / n_jobs)
+    if max_samples is not None:
+        n_samples = min(n_samples, max_samples)
+
+    classes = np.arange(len(store.classes)) if store.classes else np.unique(store.y)
+    tree_params = {'max_depth': max_depth, 'max_features': max_features}
+    seeds = np.random.RandomState(random_state).randint(MAX_INT, size=n_estimators)
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        trees = list(pool.map(lambda seed: _fit_tree(store, n_samples, int(seed),
+                                                     tree_params, len(classes)), seeds))
+
+    forest = RandomForestClassifier(n_estimators=n_estimators, random_state=random_state,
+                                    max_samples=min(n_samples, len(store)) / len(store),
+                                    **tree_params)
+    forest.estimator_ = DecisionTreeClassifier(**tree_params)
+    forest.estimators_ = trees
+    forest.classes_ = classes
+    forest.n_classes_ = len(classes)
+    forest.n_outputs_ = 1
+    forest.n_features_in_ = store.shape[1]
+    return forest
+
+
+def _bench_in_memory(filepath, n_estimators, max_depth):
+    from src.data.ingestion import load_kdd_data
+
+    data = load_kdd_data("train", filepath=filepath, use_cache=False)
+    preprocessor, target_encoder = fit_preprocessor_streaming([data])
+    model = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth,
+                                   random_state=42, n_jobs=-1)
+    model.fit(preprocessor.transform(data), target_encoder.encode(TARGET_COLUMN, data[TARGET_COLUMN]))
+    return len(data)
+
+
+def _bench_out_of_core(filepath, store_path, n_estimators, max_depth, memory_budget_mb):
+    store, _ = build_feature_store(filepath, store_path)
+    train_forest_out_of_core(store, n_estimators=n_estimators, max_depth=max_depth,
+                             memory_budget_mb=memory_budget_mb)
+    return len(store)
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    from src.utils.benchmark import print_benchmark_table, run_isolated, write_synthetic_kdd_csv
+
+    parser = argparse.ArgumentParser(description="In-memory vs out-of-core forest training")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[250_000, 1_000_000, 2_500_000, 4_900_000])
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--max-depth", type=int, default=10)
+    parser.add_argument("--budget-mb", type=float, default=DEFAULT_MEMORY_BUDGET_MB)
+    parser.add_argument("--skip-in-memory", action="store_true")
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_rows in args.sizes:
+            csv = write_synthetic_kdd_csv(os.path.join(workdir, "kdd.csv"), n_rows)
+            modes = [("out-of-core", _bench_out_of_core,
+                      (os.path.join(workdir, "store"), args.n_estimators, args.max_depth,
+                       args.budget_mb))]
+            if not args.skip_in_memory:
+                modes.insert(0, ("in-memory", _bench_in_memory,
+                                 (args.n_estimators, args.max_depth)))
+            for label, fn, extra in modes:
+                stats = run_isolated(fn, csv, *extra)
+                rows.append({'rows': n_rows, 'mode': label, 'seconds': stats['seconds'],
+                             'peak_rss_mb': stats['peak_rss_mb']})
+    print_benchmark_table(f"Forest training ({args.n_estimators} trees, depth "
+                          f"{args.max_depth}, budget {args.budget_mb:g} MB)", rows)
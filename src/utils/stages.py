@@ -0,0 +1,190 @@
+"""
+Content-addressed stage runner.
+
+Each stage is a function of its upstream stages' outputs plus a dict of
+parameters. A stage's key is the hash of its name, parameters, the source
+code of its function and the keys of its upstream stages, so changing a
+parameter (or a stage's code) invalidates that stage and everything
+downstream of it while every other stage is served from disk.
+
+The code part also covers the source of every project module the stage
+function imports or names directly (``load_kdd_data`` in
+``src.data.ingestion``, say), but not the modules *those* import. For
+changes deeper than that, bump the runner's ``code_version``, which is
+part of every key.
+"""
+import ast
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import textwrap
+import time
+
+import joblib
+import numpy as np
+
+STAGE_CACHE_ROOT = "data/processed/stage_cache"
+RESULT_NAME = "result.joblib"
+FINGERPRINTS_NAME = "fingerprints.json"
+
+
+def _jsonable(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Stage parameter of type {type(value).__name__} is not hashable")
+
+
+def _referenced_modules(fn, source):
+    """Modules of ``fn``'s own package that it imports or names from its globals."""
+    package = fn.__module__.split(".")[0]
+    modules = set()
+    for node in ast.walk(ast.parse(textwrap.dedent(source))):
+        if isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.add(node.module)
+        elif isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.Name) and node.id in fn.__globals__:
+            value = fn.__globals__[node.id]
+            modules.add(value.__name__ if inspect.ismodule(value)
+                        else getattr(value, '__module__', None) or "")
+    return sorted(m for m in modules
+                  if m.split(".")[0] == package and m != fn.__module__)
+
+
+def _code_digest(fn):
+    """Hash of ``fn``'s source plus the source of the project modules it uses."""
+    try:
+        source = inspect.getsource(fn)
+    except (OSError, TypeError):
+        source = f"{fn.__module__}.{fn.__qualname__}"
+        modules = []
+    else:
+        modules = _referenced_modules(fn, source)
+    digest = hashlib.blake2b(source.encode("utf-8"), digest_size=8)
+    for module in modules:
+        try:
+            digest.update(inspect.getsource(importlib.import_module(module)).encode("utf-8"))
+        except (ImportError, OSError, TypeError):
+            digest.update(module.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def stage_key(name, fn, params, upstream_keys, code_version=None):
+    """Hash of everything that determines a stage's output."""
+    payload = json.dumps({'stage': name, 'code': _code_digest(fn), 'params': params,
+                          'upstream': list(upstream_keys), 'code_version': code_version},
+                         sort_keys=True, default=_jsonable)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class StageCache:
+    """One directory per ``<stage>-<key>`` holding the pickled output."""
+
+    def __init__(self, root=STAGE_CACHE_ROOT):
+        self.root = root
+
+    def path_for(self, name, key):
+        return os.path.join(self.root, f"{name}-{key}")
+
+    def contains(self, name, key):
+        return os.path.exists(os.path.join(self.path_for(name, key), RESULT_NAME))
+
+    def load(self, name, key):
+        return joblib.load(os.path.join(self.path_for(name, key), RESULT_NAME))
+
+    def store(self, name, key, value):
+        """Write atomically: build in a temp dir, then rename into place."""
+        os.makedirs(self.root, exist_ok=True)
+        target = self.path_for(name, key)
+        staging = tempfile.mkdtemp(prefix=f".{name}-", dir=self.root)
+        try:
+            joblib.dump(value, os.path.join(staging, RESULT_NAME))
+            if os.path.exists(target):
+                shutil.rmtree(target)
+            os.replace(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return target
+
+    def fingerprint(self, filepath):
+        """Content hash of ``filepath``, re-hashed only when size/mtime change."""
+        from src.data.cache import file_fingerprint
+
+        path = os.path.join(self.root, FINGERPRINTS_NAME)
+        try:
+            with open(path) as handle:
+                known = json.load(handle)
+        except (OSError, ValueError):
+            known = {}
+        source = os.path.abspath(filepath)
+        stat = file_fingerprint(filepath, with_hash=False)
+        entry = known.get(source)
+        if entry and entry['size'] == stat['size'] and entry['mtime_ns'] == stat['mtime_ns']:
+            return entry['hash']
+        known[source] = file_fingerprint(filepath)
+        os.makedirs(self.root, exist_ok=True)
+        with open(path + ".tmp", "w") as handle:
+            json.dump(known, handle, indent=1)
+        os.replace(path + ".tmp", path)
+        return known[source]['hash']
+
+
+class StageRunner:
+    """Declare stages with ``add`` and evaluate them lazily with ``run``.
+
+    Only stages whose key is missing from the cache execute; an upstream
+    stage is not even loaded if everything that depends on it is cached.
+    ``code_version`` goes into every key; bump it to invalidate all stages.
+    """
+
+    def __init__(self, cache=None, code_version=None):
+        self.cache = cache if cache is not None else StageCache()
+        self.code_version = code_version
+        self.stages = {}
+        self.log = []
+
+    def add(self, name, fn, deps=(), **params):
+        """Register ``fn(*upstream_outputs, **params)`` as stage ``name``."""
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self.stages[name] = {'fn': fn, 'deps': tuple(deps), 'params': params}
+        return self
+
+    def key(self, name):
+        stage = self.stages[name]
+        return stage_key(name, stage['fn'], stage['params'],
+                         [self.key(dep) for dep in stage['deps']], self.code_version)
+
+    def run(self, name, _memo=None):
+        """Return the output of stage ``name``, computing only what changed."""
+        memo = {} if _memo is None else _memo
+        if name in memo:
+            return memo[name]
+        stage = self.stages[name]
+        key = self.key(name)
+        start = time.perf_counter()
+        if self.cache.contains(name, key):
+            value = self.cache.load(name, key)
+            status = 'cached'
+        else:
+            inputs = [self.run(dep, memo) for dep in stage['deps']]
+            start = time.perf_counter()
+            value = stage['fn'](*inputs, **stage['params'])
+            self.cache.store(name, key, value)
+            status = 'ran'
+        seconds = time.perf_counter() - start
+        self.log.append({'stage': name, 'status': status, 'key': key[:12], 'seconds': seconds})
+        print(f"{'⏭️' if status == 'cached' else '✅'} {name:10} {status:6} "
+              f"{seconds:7.2f}s  [{key[:12]}]")
+        memo[name] = value
+        return value
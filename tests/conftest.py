@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.data.schema import apply_schema
+from src.models.bundle import ModelBundle
+from src.models.preprocessing import FeaturePreprocessor
+from src.utils.benchmark import synthetic_kdd_frame
+
+
+@pytest.fixture(scope="session")
+def kdd_frame():
+    return apply_schema(synthetic_kdd_frame(3_000, seed=7))
+
+
+@pytest.fixture(scope="session")
+def bundle(kdd_frame):
+    prep = FeaturePreprocessor().fit(kdd_frame)
+    y = (kdd_frame['class'] == 'normal').to_numpy().astype(int)  # target_encoder order
+    model = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0)
+    model.fit(prep.transform(kdd_frame), y)
+    return ModelBundle.from_models(model, prep, np.array(['anomaly', 'normal']),
+                                   model_version="test")
+
+
+@pytest.fixture
+def record(kdd_frame, bundle):
+    row = kdd_frame[bundle.features].iloc[0].to_dict()
+    return {k: v.item() if hasattr(v, 'item') else v for k, v in row.items()}
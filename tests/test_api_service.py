@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.api.batching import MicroBatcher
+from src.api.service import create_app
+
+
+def _post_all(app, records, path="/predict"):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Encoded here so that inf / 10**400 reach the server as written.
+            responses = await asyncio.gather(*(
+                client.post(path, content=json.dumps(r),
+                            headers={'Content-Type': 'application/json'})
+                for r in records))
+        await app.state.batcher.stop()
+        return responses
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("value", ["123", "nan", True, None, [1]])
+def test_non_numeric_json_is_rejected_alone(bundle, record, value):
+    app = create_app(bundle, max_batch_size=64, max_wait_ms=20)
+    records = [record] * 20 + [dict(record, src_bytes=value)]
+    responses = _post_all(app, records)
+    assert [r.status_code for r in responses] == [200] * 20 + [422]
+    assert all(r.json()['prediction'] in ('anomaly', 'normal') for r in responses[:20])
+
+
+def test_predict_batch_rejects_string_numbers(bundle, record):
+    app = create_app(bundle)
+    [response] = _post_all(app, [[record, dict(record, dst_bytes="5")]], "/predict/batch")
+    assert response.status_code == 422
+    [response] = _post_all(app, [[record, dict(record, dst_bytes=5)]], "/predict/batch")
+    assert response.status_code == 200 and len(response.json()) == 2
+
+
+@pytest.mark.parametrize("value", [10**400, -10**400, float("inf")])
+@pytest.mark.parametrize("path", ["/predict", "/predict/batch"])
+def test_out_of_range_numbers_are_rejected(bundle, record, value, path):
+    app = create_app(bundle)
+    bad = dict(record, src_bytes=value)
+    [response] = _post_all(app, [[bad] if path == "/predict/batch" else bad], path)
+    assert response.status_code == 422
+    assert "src_bytes" in response.json()['detail']
+
+
+def test_frame_coerces_numeric_columns(bundle, record):
+    scorer = create_app(bundle).state.scorer
+    frame = scorer.frame([record, dict(record, src_bytes=7)])
+    assert all(frame[c].dtype.kind in "if" for c in scorer.features if c not in scorer.categorical)
+
+
+def test_batcher_isolates_failing_record():
+    def score(records):
+        if any(r == "bad" for r in records):
+            raise ValueError("bad record")
+        return [r * 2 for r in records]
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=16, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(r) for r in [1, 2, "bad", 3]),
+                                       return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+    assert results[:2] == [2, 4] and results[3] == 6
+    assert isinstance(results[2], ValueError)
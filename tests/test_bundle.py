@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from src.models.bundle import BUNDLE_FORMAT_VERSION, MAGIC, ModelBundle, read_manifest
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip_predicts_identically(tmp_path, kdd_frame, bundle, mmap):
+    path = bundle.save(str(tmp_path / "model.bundle"))
+    loaded = ModelBundle.load(path, mmap=mmap)
+
+    manifest = read_manifest(path)
+    for key in ('arrays', '_manifest_bytes'):
+        manifest.pop(key)
+    assert manifest == bundle.manifest()
+    np.testing.assert_array_equal(loaded.predict_proba(kdd_frame), bundle.predict_proba(kdd_frame))
+    np.testing.assert_array_equal(loaded.predict(kdd_frame), bundle.predict(kdd_frame))
+    assert loaded.model_version == "test"
+
+
+def test_unseen_category_survives_round_trip(tmp_path, kdd_frame, bundle):
+    loaded = ModelBundle.load(bundle.save(str(tmp_path / "model.bundle")))
+    frame = kdd_frame.head(20).copy()
+    frame['service'] = frame['service'].astype(str)
+    frame.loc[frame.index[0], 'service'] = "never_seen"
+    np.testing.assert_array_equal(loaded.predict_proba(frame), bundle.predict_proba(frame))
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "not.bundle"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError, match="not a model bundle"):
+        ModelBundle.load(str(path))
+
+
+def test_rejects_unknown_format_version(tmp_path, bundle):
+    path = bundle.save(str(tmp_path / "model.bundle"))
+    with open(path, "rb") as handle:
+        data = handle.read()
+    assert data.startswith(MAGIC)
+    version = f'"format_version": {BUNDLE_FORMAT_VERSION}'.encode()
+    with open(path, "wb") as handle:  # same length, so the header stays valid
+        handle.write(data.replace(version, version[:-1] + b"9", 1))
+    with pytest.raises(ValueError, match="Unsupported bundle format"):
+        ModelBundle.load(path)
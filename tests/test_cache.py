@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.data.ingestion import load_kdd_data
+from src.utils.benchmark import write_synthetic_kdd_csv
+
+
+def _as_plain(frame):
+    return frame.apply(lambda c: c.astype(object) if c.dtype.kind not in "biuf" else c)
+
+
+def test_cached_load_matches_read_csv(tmp_path):
+    path = str(tmp_path / "conn.csv")
+    write_synthetic_kdd_csv(path, 2_500, chunksize=1_000)
+    frame = pd.read_csv(path)
+    frame.loc[3, 'service'] = np.nan  # missing categorical
+    frame.loc[5, 'src_bytes'] = np.nan  # int column widened to float mid-file
+    frame.to_csv(path, index=False)
+    expected = pd.read_csv(path)
+    cache_root = str(tmp_path / "cache")
+
+    for _ in range(2):  # build, then memory-mapped hit
+        loaded = load_kdd_data("train", filepath=path, chunksize=1_000, cache_root=cache_root,
+                               apply_schema=False)
+        pd.testing.assert_frame_equal(_as_plain(loaded), _as_plain(expected), check_dtype=False)
+        assert (loaded.dtypes.apply(lambda d: d.kind) == expected.dtypes.apply(lambda d: d.kind)
+                ).loc[['src_bytes', 'duration']].all()
+
+
+def test_cache_rebuilds_when_source_changes(tmp_path):
+    path = str(tmp_path / "conn.csv")
+    write_synthetic_kdd_csv(path, 500)
+    cache_root = str(tmp_path / "cache")
+    load_kdd_data("train", filepath=path, cache_root=cache_root, apply_schema=False)
+
+    changed = pd.read_csv(path).iloc[:300]
+    changed.to_csv(path, index=False)
+    os.utime(path, ns=(1, 1))
+    loaded = load_kdd_data("train", filepath=path, cache_root=cache_root, apply_schema=False)
+    assert len(loaded) == 300
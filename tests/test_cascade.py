@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from src.models.cascade import fit_cascade, tune_band
+
+
+def _tied_data(n_unique=60, copies=25, seed=0):
+    """Few distinct rows, each repeated, so the linear probabilities tie."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_unique, 4)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] ** 2 - 1 > 0).astype(int)
+    y[rng.random(n_unique) < 0.1] ^= 1  # label noise the linear model cannot fit
+    return np.repeat(X, copies, axis=0), np.repeat(y, copies)
+
+
+@pytest.mark.parametrize("max_thresholds", [1_000, 7])
+@pytest.mark.parametrize("tolerance", [0.0, 0.02])
+def test_realized_band_matches_report_with_ties(tolerance, max_thresholds):
+    X, y = _tied_data()
+    linear = LogisticRegression().fit(X, y)
+    forest = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    cascade, report = fit_cascade(linear, forest, X, y, tolerance)
+    if max_thresholds != 1_000:
+        proba = cascade.linear_proba(X)
+        low, high, report = tune_band(proba, (proba > 0.5).astype(int), forest.predict(X), y,
+                                      tolerance, max_thresholds=max_thresholds)
+        cascade.low, cascade.high = low, high
+
+    predictions = cascade.predict(X)
+    assert np.mean(predictions == y) == pytest.approx(report['cascade_accuracy'])
+    assert cascade.skip_fraction == pytest.approx(report['skip_fraction'])
+    assert report['cascade_accuracy'] >= report['forest_accuracy'] - tolerance - 1e-9
+
+
+def test_thresholds_never_split_tied_probabilities():
+    proba = np.repeat(np.array([0.1, 0.3, 0.3, 0.45, 0.7, 0.9], dtype=np.float32), 3)
+    y = (proba > 0.35).astype(int)
+    linear_pred = (proba > 0.5).astype(int)
+    low, high, report = tune_band(proba, linear_pred, y, y)  # forest is perfect
+    in_band = (proba >= low) & (proba <= high)
+    assert report['cascade_accuracy'] == 1.0
+    assert report['skip_fraction'] == pytest.approx(1 - in_band.mean())
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.models.compiled_forest import CompiledForest
+
+
+def _data(n=3_000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.normal(size=n), rng.integers(0, 5, n), rng.exponential(size=n),
+                         rng.random(n).round(2)]).astype(np.float32)
+    y = ((X[:, 0] + X[:, 1] / 3 + rng.normal(scale=0.5, size=n)) > 1).astype(int)
+    return X, y
+
+
+def _threshold_rows(model, X, n_rows=500, seed=1):
+    """Rows whose features sit exactly on (float32-cast) split thresholds."""
+    rng = np.random.default_rng(seed)
+    rows = X[rng.integers(0, len(X), n_rows)].copy()
+    for estimator in model.estimators_[:5]:
+        tree = estimator.tree_
+        splits = np.flatnonzero(tree.children_left != -1)
+        for node in rng.choice(splits, min(50, len(splits)), replace=False):
+            rows[rng.integers(0, n_rows), tree.feature[node]] = np.float32(tree.threshold[node])
+    return rows
+
+
+def _assert_same(model, X):
+    compiled = CompiledForest.from_sklearn(model)
+    np.testing.assert_array_equal(compiled.predict_proba(X), model.predict_proba(X))
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+
+
+@pytest.mark.parametrize("max_depth", [3, 10, None])
+def test_matches_sklearn(max_depth):
+    X, y = _data()
+    model = RandomForestClassifier(n_estimators=20, max_depth=max_depth, random_state=0).fit(X, y)
+    _assert_same(model, X)
+    _assert_same(model, X[:1])
+    _assert_same(model, _threshold_rows(model, X))
+
+
+def test_matches_sklearn_with_missing_values():
+    X, y = _data()
+    X_missing = X.copy()
+    X_missing[np.random.default_rng(2).random(X.shape) < 0.1] = np.nan
+    # Trained with NaNs (learned directions) and without (NaN unseen in fit).
+    for X_train in (X_missing, X):
+        model = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0)
+        model.fit(X_train, y)
+        _assert_same(model, X_missing)
+
+
+def test_save_load_roundtrip(tmp_path):
+    X, y = _data()
+    model = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_sklearn(model)
+    loaded = CompiledForest.load(compiled.save(str(tmp_path / "forest")))
+    np.testing.assert_array_equal(loaded.predict_proba(X), compiled.predict_proba(X))
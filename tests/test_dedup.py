@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from src.data.dedup import (WEIGHT_COLUMN, FingerprintTable, StreamingDeduplicator,
+                            deduplicate_frame)
+
+
+def test_matches_pandas_drop_duplicates(kdd_frame):
+    frame = pd.concat([kdd_frame, kdd_frame.sample(2_000, random_state=1)], ignore_index=True)
+    unique = deduplicate_frame(frame, chunksize=700)
+
+    expected = frame.drop_duplicates()
+    pd.testing.assert_frame_equal(unique.drop(columns=WEIGHT_COLUMN), expected,
+                                  check_dtype=False)
+    counts = frame.groupby(list(frame.columns), observed=True, dropna=False).size()
+    keys = pd.MultiIndex.from_frame(expected)
+    np.testing.assert_array_equal(unique[WEIGHT_COLUMN], counts.reindex(keys).to_numpy())
+
+
+def test_counts_survive_table_growth():
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 300_000, 1_000_000)
+    dedup = StreamingDeduplicator()
+    for start in range(0, len(values), 50_000):
+        dedup.update(pd.DataFrame({'v': values[start:start + 50_000]}))
+    distinct, counts = np.unique(values, return_counts=True)
+    assert dedup.unique_rows == len(distinct)
+    assert dedup.weights().sum() == len(values)
+    np.testing.assert_array_equal(np.sort(dedup.weights()), np.sort(counts))
+
+
+def test_fingerprint_table_lookup_and_insert():
+    table = FingerprintTable(capacity=4)
+    keys = np.random.default_rng(0).integers(0, 2**63, 10_000, dtype=np.uint64)
+    table.insert(keys[:6_000], np.arange(6_000))
+    table.insert(keys[6_000:], np.arange(6_000, 10_000))
+    assert len(table) == 10_000
+    np.testing.assert_array_equal(table.lookup(keys), np.arange(10_000))
+    missing = np.array([0, 1, 2**64 - 1], dtype=np.uint64)
+    assert np.all(table.lookup(np.setdiff1d(missing, keys)) == -1)
+
+
+def test_fingerprint_table_handles_colliding_cells():
+    table = FingerprintTable(capacity=1 << 12)
+    keys = (np.arange(1, 200, dtype=np.uint64) << np.uint64(32))  # identical low bits
+    table.insert(keys, np.arange(len(keys)))
+    np.testing.assert_array_equal(table.lookup(keys[::-1]), np.arange(len(keys))[::-1])
+    assert table.lookup(np.array([7 << 40], dtype=np.uint64))[0] == -1
@@ -0,0 +1,29 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from src.models.encoders import CategoricalEncoder
+
+
+def _encoder(unknown_code=-1):
+    frame = pd.DataFrame({'service': ['http', 'ftp', 'smtp', 'http']})
+    return CategoricalEncoder(unknown_code=unknown_code).fit(frame, ['service'])
+
+
+def test_known_values_match_label_encoder():
+    values = ['smtp', 'http', 'ftp', 'http']
+    expected = LabelEncoder().fit(['http', 'ftp', 'smtp']).transform(values)
+    np.testing.assert_array_equal(_encoder().encode('service', values), expected)
+
+
+def test_unseen_values_map_to_unknown_code_without_warnings():
+    values = ['http', 'zzz', 'ftp', None]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        plain = _encoder(unknown_code=3).encode('service', values)
+        categorical = _encoder(unknown_code=3).encode(
+            'service', pd.Series(values, dtype="category"))
+    np.testing.assert_array_equal(plain, [1, 3, 0, 3])
+    np.testing.assert_array_equal(categorical, plain)
@@ -0,0 +1,40 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.models import online
+from src.models.online import OnlineScorer, PSIDetector
+
+
+def _data(n, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4)).astype(np.float32)
+    return X, (X[:, 0] > 0).astype(int)
+
+
+def test_retrain_swaps_detectors_by_reference_and_writes_outside_lock(monkeypatch):
+    X, y = _data(2_000, 0)
+    model = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0).fit(X, y)
+    lock_held = []
+    write = online.write_feature_store
+
+    def checked_write(*args, **kwargs):
+        lock_held.append(scorer._lock.locked())
+        return write(*args, **kwargs)
+
+    monkeypatch.setattr(online, "write_feature_store", checked_write)
+    with OnlineScorer(model, X, rf_params={'n_estimators': 5, 'max_depth': 4},
+                      min_retrain_rows=500,
+                      psi_detector=PSIDetector(X, window=1_000)) as scorer:
+        old_psi, old_errors = scorer.psi_detector, scorer.error_detector
+        old_edges = [edges.copy() for edges in old_psi.edges]
+        scorer._drift('test')
+        X_new, y_new = _data(600, 1)
+        scorer.feedback(X_new, y_new)
+        scorer.wait()
+
+        assert lock_held == [False]
+        assert scorer.version == 1 and not scorer.retraining
+        assert scorer.psi_detector is not old_psi and scorer.error_detector is not old_errors
+        # The detector a concurrent update might still hold was left untouched.
+        assert all(np.array_equal(a, b) for a, b in zip(old_psi.edges, old_edges))
+        assert len(scorer.score(X_new)) == len(X_new)
@@ -0,0 +1,19 @@
+import numpy as np
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from src.models.preprocessing import CATEGORICAL_FEATURES, NUMERICAL_FEATURES, FeaturePreprocessor
+
+
+def test_fused_transform_rounds_once_from_float64(kdd_frame):
+    frame = kdd_frame.copy()
+    # Large offsets with small spread: a float32 intermediate loses the spread.
+    frame['src_bytes'] = 3_000_000_000 + np.arange(len(frame)) % 7
+    label_encoders = {f: LabelEncoder().fit(frame[f].astype(str)) for f in CATEGORICAL_FEATURES}
+    scaler = StandardScaler().fit(frame[NUMERICAL_FEATURES])
+    prep = FeaturePreprocessor.from_artifacts(label_encoders, scaler)
+
+    expected = scaler.transform(frame[NUMERICAL_FEATURES]).astype(np.float32)
+    columns = [prep.features.index(f) for f in NUMERICAL_FEATURES]
+    np.testing.assert_array_equal(prep.transform(frame)[:, columns], expected)
+    buffer = prep.allocate(len(frame) + 10)
+    np.testing.assert_array_equal(prep.transform(frame, out=buffer)[:, columns], expected)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from src.models.scaler import StreamingStandardScaler
+
+COLUMNS = ['a', 'b', 'c']
+
+
+def _frame(n=5_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'a': rng.normal(1e6, 3, n), 'b': rng.exponential(size=n),
+                         'c': np.zeros(n)})
+
+
+def _assert_matches(streaming, sklearn_scaler):
+    np.testing.assert_allclose(streaming.mean_, sklearn_scaler.mean_, rtol=1e-12)
+    np.testing.assert_allclose(streaming.var_, sklearn_scaler.var_, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(streaming.scale_, sklearn_scaler.scale_, rtol=1e-9)
+
+
+def test_chunked_fit_matches_sklearn():
+    frame = _frame()
+    streaming = StreamingStandardScaler(COLUMNS)
+    streaming.fit_chunks(frame.iloc[i:i + 777] for i in range(0, len(frame), 777))
+    _assert_matches(streaming, StandardScaler().fit(frame[COLUMNS]))
+    np.testing.assert_allclose(streaming.transform(frame[COLUMNS]),
+                               StandardScaler().fit_transform(frame[COLUMNS]), atol=1e-9)
+
+
+def test_merge_matches_single_pass():
+    frame = _frame()
+    left = StreamingStandardScaler(COLUMNS).partial_fit(frame.iloc[:1_234])
+    right = StreamingStandardScaler(COLUMNS).partial_fit(frame.iloc[1_234:])
+    _assert_matches(left.merge(right), StandardScaler().fit(frame[COLUMNS]))
+
+
+def test_weighted_fit_matches_sklearn():
+    frame = _frame()
+    weights = np.random.default_rng(1).integers(1, 5, len(frame)).astype(float)
+    streaming = StreamingStandardScaler(COLUMNS)
+    for start in range(0, len(frame), 1_000):
+        streaming.partial_fit(frame.iloc[start:start + 1_000],
+                              sample_weight=weights[start:start + 1_000])
+    _assert_matches(streaming, StandardScaler().fit(frame[COLUMNS], sample_weight=weights))
+
+
+def test_to_sklearn_roundtrip():
+    frame = _frame()
+    streaming = StreamingStandardScaler(COLUMNS).partial_fit(frame)
+    _assert_matches(StreamingStandardScaler.from_sklearn(streaming.to_sklearn()),
+                    StandardScaler().fit(frame[COLUMNS]))
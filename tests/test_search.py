@@ -0,0 +1,49 @@
+import numpy as np
+
+from src.data.feature_store import write_feature_store
+from src.models import search
+
+
+def _stores(tmp_path, n=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 6)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] > 0).astype(np.int64)
+    names = [f"f{i}" for i in range(6)]
+    train = write_feature_store(str(tmp_path / "train"), X[:1_500], y[:1_500], names, [0, 1])
+    valid = write_feature_store(str(tmp_path / "valid"), X[1_500:], y[1_500:], names, [0, 1])
+    return train, valid
+
+
+def _fake_latency(model, X, batch_size=1, repeats=search.LATENCY_REPEATS):
+    return 9.0 if model.max_depth is None else 1.0  # deep trees are "slow"
+
+
+CANDIDATES = [{'n_estimators': 5, 'max_depth': depth, 'max_features': None,
+               'min_samples_leaf': 1} for depth in (None, 1, 2, 3)]
+
+
+def test_over_budget_candidates_are_not_promoted(tmp_path, monkeypatch):
+    monkeypatch.setattr(search, "measure_latency", _fake_latency)
+    train, valid = _stores(tmp_path)
+    best, history = search.successive_halving(train, valid, CANDIDATES, eta=2, min_rows=300,
+                                              latency_budget_ms=5.0, max_workers=1)
+    assert best['max_depth'] is not None
+    later = history[history['rung'] > 0]
+    assert len(later) and later['max_depth'].notna().all()
+    assert (later['latency_ms'] <= 5.0).all()
+
+
+def test_search_stops_when_nothing_meets_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(search, "measure_latency", _fake_latency)
+    train, valid = _stores(tmp_path)
+    _, history = search.successive_halving(train, valid, CANDIDATES[:1], min_rows=300,
+                                           latency_budget_ms=5.0, max_workers=1)
+    assert history['rung'].max() == 0
+
+
+def test_latency_is_measured_after_fitting(tmp_path):
+    train, valid = _stores(tmp_path)
+    _, history = search.successive_halving(train, valid, CANDIDATES[1:3], eta=2, min_rows=300,
+                                           max_workers=1)
+    assert (history['latency_ms'] > 0).all()
+    assert 'model' not in history.columns
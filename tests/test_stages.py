@@ -0,0 +1,45 @@
+import importlib
+import sys
+
+import pytest
+
+from src.models.pipeline import load_stage
+from src.utils.stages import StageCache, StageRunner
+
+
+def _runner(tmp_path, code_version=None):
+    module = importlib.import_module("stagepkg.stages")
+    return StageRunner(StageCache(str(tmp_path / "cache")), code_version).add(
+        'double', module.double_stage, factor=2)
+
+
+@pytest.fixture
+def stagepkg(tmp_path, monkeypatch):
+    package = tmp_path / "pkg" / "stagepkg"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "helpers.py").write_text("def scale(x):\n    return x * 1\n")
+    (package / "stages.py").write_text(
+        "def double_stage(factor):\n"
+        "    from stagepkg.helpers import scale\n"
+        "    return scale(21) * factor\n")
+    monkeypatch.syspath_prepend(str(tmp_path / "pkg"))
+    yield package
+    for name in [n for n in sys.modules if n.startswith("stagepkg")]:
+        del sys.modules[name]
+
+
+def test_key_tracks_imported_project_modules(tmp_path, stagepkg):
+    before = _runner(tmp_path).key('double')
+    assert _runner(tmp_path).key('double') == before
+    (stagepkg / "helpers.py").write_text("def scale(x):\n    return x * 10\n")
+    assert _runner(tmp_path).key('double') != before
+
+
+def test_code_version_invalidates_every_stage(tmp_path, stagepkg):
+    assert _runner(tmp_path, 1).key('double') != _runner(tmp_path, 2).key('double')
+
+
+def test_load_stage_reports_unreadable_data(tmp_path):
+    with pytest.raises(RuntimeError, match="Could not load training data"):
+        load_stage(str(tmp_path / "missing.csv"), None, ['duration'], False)
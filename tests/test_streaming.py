@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+
+from src.api.service import BundleScorer
+from src.api.streaming import stream_predictions
+
+
+async def _chunks(body, size=37):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def _stream(bundle, body, fmt="ndjson", batch_size=4, chunk_size=37, **kwargs):
+    async def collect():
+        out = b""
+        async for chunk in stream_predictions(BundleScorer(bundle), _chunks(body, chunk_size), fmt,
+                                              batch_size, **kwargs):
+            out += chunk
+        return [json.loads(line) for line in out.decode().splitlines()]
+
+    return asyncio.run(collect())
+
+
+def test_ndjson_reports_bad_lines_in_place(bundle, record):
+    missing = {k: v for k, v in record.items() if k != 'flag'}
+    lines = [json.dumps(record), json.dumps(missing), "{not json", "",
+             json.dumps({**record, 'src_bytes': "lots"}), json.dumps([1, 2]), json.dumps(record)]
+    results = _stream(bundle, ("\n".join(lines) + "\n").encode())
+
+    assert [r['line'] for r in results] == [1, 2, 3, 5, 6, 7]
+    assert "prediction" in results[0] and "prediction" in results[-1]
+    assert results[1]['error'] == "Missing fields: ['flag']"
+    assert "error" in results[2]
+    assert results[3]['error'] == "Field 'src_bytes' must be a finite number, got 'lots'"
+    assert results[4]['error'] == "Each line must be a JSON object"
+
+
+@pytest.mark.parametrize("value", ['"5"', "true", "null", "Infinity", "NaN", "1e999",
+                                   "1" + "0" * 400])
+def test_ndjson_numbers_are_checked_like_predict(bundle, record, value):
+    line = json.dumps(dict(record, src_bytes=0)).replace('"src_bytes": 0', f'"src_bytes": {value}')
+    results = _stream(bundle, (json.dumps(record) + "\n" + line + "\n").encode())
+    assert "prediction" in results[0]
+    assert results[1]['error'].startswith("Field 'src_bytes' must be a finite number")
+
+
+@pytest.mark.parametrize("value", ["inf", "-Infinity", "nan", "1e999", "true", "abc", ""])
+def test_csv_numbers_are_checked_like_predict(bundle, kdd_frame, value):
+    frame = kdd_frame[bundle.features].head(2).astype(object)
+    frame.iloc[1, bundle.features.index('dst_bytes')] = value
+    results = _stream(bundle, frame.to_csv(index=False).encode(), fmt="csv")
+    assert "prediction" in results[0]
+    assert results[1] == {'line': 3, 'error': f"Field 'dst_bytes' must be a finite number, "
+                                              f"got {value!r}"}
+
+
+def test_ndjson_matches_bundle_predictions(bundle, kdd_frame):
+    frame = kdd_frame[bundle.features].head(25)
+    results = _stream(bundle, frame.to_json(orient="records", lines=True).encode(), batch_size=7)
+    expected = bundle.predict(frame)
+    assert [r['prediction'] for r in results] == [str(label) for label in expected]
+
+
+def test_csv_field_count_mismatch(bundle, kdd_frame):
+    frame = kdd_frame[bundle.features].head(3)
+    body = frame.to_csv(index=False).splitlines()
+    body.insert(2, "1,2,3")
+    results = _stream(bundle, ("\n".join(body) + "\n").encode(), fmt="csv")
+
+    assert [r['line'] for r in results] == [2, 3, 4, 5]
+    assert results[1]['error'] == f"Expected {len(bundle.features)} fields, got 3"
+    assert all("prediction" in r for r in results if r['line'] != 3)
+
+
+def test_csv_bad_header_stops_the_stream(bundle, kdd_frame):
+    body = kdd_frame[bundle.features].head(3).drop(columns=['flag']).to_csv(index=False)
+    results = _stream(bundle, body.encode(), fmt="csv")
+    assert results == [{'line': None, 'error': "CSV header is missing fields: ['flag']"}]
+
+
+def test_over_long_line_stops_the_stream(bundle, record):
+    good = json.dumps(record)
+    limit = len(good) + 10
+    body = (good + "\n" + "x" * (4 * limit)).encode()
+    results = _stream(bundle, body, batch_size=1, max_line_bytes=limit)
+    assert "prediction" in results[0]
+    assert results[-1] == {'line': None, 'error': f"A line is longer than {limit} bytes"}
+
+
+def test_over_long_line_inside_one_chunk_stops_the_stream(bundle, record):
+    good = json.dumps(record)
+    limit = len(good) + 10
+    body = (good + "\n" + "x" * (2 * limit) + "\n" + good + "\n").encode()
+    results = _stream(bundle, body, chunk_size=len(body), max_line_bytes=limit)
+    assert results == [{'line': None, 'error': f"A line is longer than {limit} bytes"}]
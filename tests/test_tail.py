@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pandas as pd
+
+from src.data import tail
+from src.data.tail import LogTailer
+
+
+def _tail(path, **kwargs):
+    batches = []
+
+    async def run():
+        tailer = LogTailer(path, batches.append, batch_size=500, max_delay=0.01,
+                           poll_interval=0.01, from_start=True, **kwargs)
+        task = asyncio.create_task(tailer.run())
+        await asyncio.sleep(0.3)
+        tailer.stop()
+        await task
+        return tailer
+
+    tailer = asyncio.run(run())
+    return tailer, (pd.concat(batches, ignore_index=True) if batches else None)
+
+
+def test_bad_csv_line_is_rejected_and_tailing_continues(tmp_path):
+    path = tmp_path / "conn.csv"
+    rows = [f"{i},tcp,{i * 10}" for i in range(50)]
+    rows.insert(20, "0,tcp,not-a-number")
+    path.write_text("duration,protocol_type,src_bytes\n" + "\n".join(rows) + "\n")
+
+    tailer, frame = _tail(path)
+    assert tailer.rejected == 1
+    assert len(frame) == 50 and frame['src_bytes'].sum() == sum(i * 10 for i in range(50))
+
+
+def test_bad_jsonl_line_is_rejected(tmp_path):
+    path = tmp_path / "conn.jsonl"
+    path.write_text('{"duration": 1, "src_bytes": 5}\n{broken\n{"duration": 2, "src_bytes": 6}\n')
+    tailer, frame = _tail(path)
+    assert tailer.rejected == 1 and frame['duration'].tolist() == [1, 2]
+
+
+def test_backlog_is_read_in_bounded_pieces(tmp_path, monkeypatch):
+    monkeypatch.setattr(tail, "MAX_READ_BYTES", 1_000)
+    path = tmp_path / "conn.csv"
+    path.write_text("duration,src_bytes\n" + "".join(f"{i},{i}\n" for i in range(5_000)))
+    tailer, frame = _tail(path)
+    assert frame['duration'].tolist() == list(range(5_000))
+    assert tailer.rejected == 0
+
+
+def test_backlog_lag_counts_from_read_time(tmp_path):
+    path = tmp_path / "conn.csv"
+    path.write_text("duration,src_bytes\n" + "".join(f"{i},{i}\n" for i in range(30)))
+
+    async def run():
+        tailer = LogTailer(path, lambda frame: time.sleep(0.05), batch_size=10,
+                           max_delay=0.01, poll_interval=0.01, from_start=True)
+        task = asyncio.create_task(tailer.run())
+        await asyncio.sleep(0.4)
+        tailer.stop()
+        await task
+        return tailer
+
+    stats = asyncio.run(run()).stats()
+    assert stats['batches'] == 3
+    # The third batch of the backlog waited behind two 50 ms callbacks.
+    assert stats['max_lag_ms'] >= 140
+
+
+def test_file_recreated_after_rotation_is_read_from_the_start(tmp_path):
+    path = tmp_path / "conn.csv"
+    path.write_text("duration,src_bytes\n1,1\n")
+    tailer = LogTailer(path, None)
+    assert tailer._read_available() == []  # starts at the end of the existing file
+
+    path.rename(tmp_path / "conn.csv.1")
+    path.write_text("duration,src_bytes\n2,2\n")
+    real_open = tailer._open
+    attempts = []
+
+    def open_once_missing(seek_end):
+        attempts.append(seek_end)
+        return False if len(attempts) == 1 else real_open(seek_end)
+
+    tailer._open = open_once_missing  # the new file is not there on the first try
+    assert tailer._read_available() == []
+    with open(path, "a") as handle:
+        handle.write("3,3\n")
+    assert tailer._read_available() == [b"2,2", b"3,3"]
+    assert attempts == [False, False] and tailer.rotations == 1
+    tailer._handle.close()
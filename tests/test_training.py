@@ -0,0 +1,50 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from src.data.feature_store import write_feature_store
+from src.models.compiled_forest import CompiledForest
+from src.models.training import rows_for_budget, train_forest_out_of_core
+
+
+@pytest.fixture
+def stores(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(12_000, 5)).astype(np.float32)
+    y = (X[:, 0] - X[:, 1] > 0.2).astype(np.int64)
+    names = [f"f{i}" for i in range(5)]
+    train = write_feature_store(str(tmp_path / "train"), X[:10_000], y[:10_000], names,
+                                ['anomaly', 'normal'])
+    valid = write_feature_store(str(tmp_path / "valid"), X[10_000:], y[10_000:], names,
+                                ['anomaly', 'normal'])
+    return train, valid
+
+
+def _root_samples(forest):
+    return np.array([tree.tree_.n_node_samples[0] for tree in forest.estimators_])
+
+
+def test_out_of_core_forest_is_accurate(stores):
+    train, valid = stores
+    forest = train_forest_out_of_core(train.path, n_estimators=15, max_depth=8, max_samples=2_000)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # no feature-name warnings on ndarray input
+        accuracy = np.mean(forest.predict(np.asarray(valid.X)) == valid.y)
+        compiled = CompiledForest.from_sklearn(forest).predict_proba(np.asarray(valid.X))
+    assert accuracy > 0.95
+    np.testing.assert_allclose(compiled, forest.predict_proba(np.asarray(valid.X)), atol=1e-12)
+
+
+def test_each_tree_sees_its_own_bounded_subsample(stores):
+    train, _ = stores
+    forest = train_forest_out_of_core(train, n_estimators=8, max_depth=4, max_samples=1_000)
+    samples = _root_samples(forest)
+    assert np.all(np.abs(samples - 1_000) < 150)  # uniform row mask, ~1_000 expected
+    assert len({tree.random_state for tree in forest.estimators_}) == 8
+
+    budget_mb = 0.2
+    expected = rows_for_budget(train.shape[1], budget_mb)
+    forest = train_forest_out_of_core(train, n_estimators=4, max_depth=4,
+                                      memory_budget_mb=budget_mb)
+    assert np.all(np.abs(_root_samples(forest) - expected) < 0.15 * expected)